@@ -0,0 +1,293 @@
+import json
+import threading
+from collections import defaultdict
+from functools import partial, reduce
+from operator import and_, or_
+
+from django.conf import settings
+from django.db import connections
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete
+
+from api.cache import get_versions
+from reviews.models import Category, Genre, Title
+
+
+def ids_to_bits(ids):
+    if not ids:
+        return 0
+    data = bytearray(max(ids) // 8 + 1)
+    for pk in ids:
+        data[pk >> 3] |= 1 << (pk & 7)
+    return int.from_bytes(data, 'little')
+
+
+def bits_to_ids(bits):
+    ids = []
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    for position, byte in enumerate(data):
+        if byte:
+            base = position * 8
+            ids.extend(base + bit for bit in range(8) if byte >> bit & 1)
+    return ids
+
+
+def filter_by_ids(queryset, ids):
+    """Ограничивает выборку списком id.
+
+    В SQLite список передаётся одним JSON-параметром, чтобы не упереться
+    в лимит числа параметров запроса на больших каталогах.
+    """
+    if connections[queryset.db].vendor == 'sqlite':
+        return queryset.filter(pk__in=RawSQL(
+            'SELECT value FROM json_each(%s)', (json.dumps(ids),)))
+    return queryset.filter(pk__in=ids)
+
+
+def filter_in_db(queryset, genre_ids=None, all_genres=False,
+                 category_ids=None, year_min=None, year_max=None):
+    """Те же условия, что у TitleBitmapIndex.match, но в SQL."""
+    links = Title.genre.through.objects.values('title_id')
+    if genre_ids is not None:
+        if all_genres:
+            for genre_id in genre_ids or [None]:
+                queryset = queryset.filter(
+                    pk__in=links.filter(genre_id=genre_id))
+        else:
+            queryset = queryset.filter(
+                pk__in=links.filter(genre_id__in=genre_ids))
+    if category_ids is not None:
+        queryset = queryset.filter(category_id__in=category_ids)
+    if year_min is not None:
+        queryset = queryset.filter(year__gte=year_min)
+    if year_max is not None:
+        queryset = queryset.filter(year__lte=year_max)
+    return queryset
+
+
+class TitleBitmapIndex:
+    """Битовые множества id произведений по жанрам, категориям и годам.
+
+    Бит n установлен, если в множество входит произведение с id=n, так
+    что фильтр по нескольким жанрам, категориям и диапазону лет сводится
+    к операциям & и | над целыми числами. Изменения из этого процесса
+    применяются точечно по сигналам; если версии в снимке запроса (см.
+    api/cache.py) отличаются от версий индекса, он перестраивается
+    целиком, так что фильтр совпадает с версией в ключе кеша ответа.
+
+    Множество занимает бит на каждый id до наибольшего в нём, а не на
+    элемент, поэтому память и цена обновлений растут с наибольшим id.
+    Если id превышают API_BITMAP_MAX_ID, индекс не строится и условия
+    уходят в SQL (filter_in_db).
+    """
+
+    collections = ('titles', 'genres', 'categories')
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._versions = None
+        self._oversized = False
+        # id произведения -> (category_id, year, frozenset(genre_ids))
+        self._titles = {}
+        self._genres = {}
+        self._categories = {}
+        self._years = {}
+
+    def invalidate(self):
+        with self._lock:
+            self._versions = None
+
+    def refresh(self):
+        # Версии читаются до данных: запись между двумя чтениями
+        # приведёт лишь к лишней перестройке, а не к устаревшему индексу.
+        versions = dict(zip(self.collections,
+                            get_versions(*self.collections)))
+        if versions != self._versions:
+            with self._lock:
+                if versions != self._versions:
+                    self._load(versions)
+
+    def _load(self, versions):
+        titles = {
+            pk: (category_id, year, set())
+            for pk, category_id, year in Title.objects.values_list(
+                'pk', 'category_id', 'year')
+        }
+        self._oversized = max(titles, default=0) > settings.API_BITMAP_MAX_ID
+        if self._oversized:
+            self._titles = {}
+            self._genres = self._categories = self._years = {}
+            self._versions = versions
+            return
+        for title_id, genre_id in Title.genre.through.objects.values_list(
+            'title_id', 'genre_id'
+        ):
+            if title_id in titles:
+                titles[title_id][2].add(genre_id)
+        genre_ids = defaultdict(list)
+        category_ids = defaultdict(list)
+        year_ids = defaultdict(list)
+        for pk, (category_id, year, title_genres) in titles.items():
+            if category_id is not None:
+                category_ids[category_id].append(pk)
+            year_ids[year].append(pk)
+            for genre_id in title_genres:
+                genre_ids[genre_id].append(pk)
+        self._titles = {
+            pk: (category_id, year, frozenset(title_genres))
+            for pk, (category_id, year, title_genres) in titles.items()
+        }
+        self._genres = self._to_bits(genre_ids)
+        self._categories = self._to_bits(category_ids)
+        self._years = self._to_bits(year_ids)
+        self._versions = versions
+
+    @staticmethod
+    def _to_bits(groups):
+        return {key: ids_to_bits(ids) for key, ids in groups.items()}
+
+    @staticmethod
+    def _move(bitsets, pk, old_key, new_key):
+        if old_key == new_key:
+            return
+        bit = 1 << pk
+        if old_key is not None and old_key in bitsets:
+            bitsets[old_key] &= ~bit
+        if new_key is not None:
+            bitsets[new_key] = bitsets.get(new_key, 0) | bit
+
+    def _set_title(self, pk, category_id, year):
+        old_category, old_year, title_genres = self._titles.get(
+            pk, (None, None, frozenset()))
+        self._move(self._categories, pk, old_category, category_id)
+        self._move(self._years, pk, old_year, year)
+        self._titles[pk] = (category_id, year, title_genres)
+
+    def _remove_title(self, pk):
+        if pk not in self._titles:
+            return
+        category_id, year, title_genres = self._titles.pop(pk)
+        self._move(self._categories, pk, category_id, None)
+        self._move(self._years, pk, year, None)
+        for genre_id in title_genres:
+            self._move(self._genres, pk, genre_id, None)
+
+    def _reload_title_genres(self, title_ids):
+        title_genres = defaultdict(set)
+        for title_id, genre_id in Title.genre.through.objects.filter(
+            title_id__in=title_ids
+        ).values_list('title_id', 'genre_id'):
+            title_genres[title_id].add(genre_id)
+        for pk in title_ids:
+            if pk not in self._titles:
+                continue
+            category_id, year, old_genres = self._titles[pk]
+            new_genres = frozenset(title_genres[pk])
+            for genre_id in old_genres - new_genres:
+                self._move(self._genres, pk, genre_id, None)
+            for genre_id in new_genres - old_genres:
+                self._move(self._genres, pk, None, genre_id)
+            self._titles[pk] = (category_id, year, new_genres)
+
+    def _drop_genre(self, genre_id):
+        for pk in bits_to_ids(self._genres.pop(genre_id, 0)):
+            category_id, year, title_genres = self._titles[pk]
+            self._titles[pk] = (category_id, year, title_genres - {genre_id})
+
+    def _drop_category(self, category_id):
+        # Категория у произведений обнуляется (SET_NULL) без сигналов.
+        for pk in bits_to_ids(self._categories.pop(category_id, 0)):
+            _, year, title_genres = self._titles[pk]
+            self._titles[pk] = (None, year, title_genres)
+
+    def _unchanged(self):
+        pass
+
+    def get_change(self, sender, signal, instance, **kwargs):
+        """Точечное изменение индекса по сигналу модели.
+
+        Значения берутся в момент сигнала, а применяются после коммита
+        (см. apply). None - изменение не описать, нужна перестройка.
+        """
+        deleted = signal is post_delete
+        if sender is Title:
+            if deleted:
+                return partial(self._remove_title, instance.pk)
+            if instance.pk > settings.API_BITMAP_MAX_ID:
+                return None
+            return partial(self._set_title, instance.pk,
+                           instance.category_id, instance.year)
+        if sender is Title.genre.through:
+            if kwargs['reverse']:
+                title_ids = kwargs['pk_set']
+            else:
+                title_ids = {instance.pk}
+            if title_ids is None:
+                return None
+            return partial(self._reload_title_genres, set(title_ids))
+        if not deleted:
+            # Новый или переименованный жанр (категория) без произведений
+            # множеств не меняет.
+            return self._unchanged
+        if sender is Genre:
+            return partial(self._drop_genre, instance.pk)
+        if sender is Category:
+            return partial(self._drop_category, instance.pk)
+        return None
+
+    def apply(self, collection, version, change):
+        """Применяет изменение этого процесса после сдвига версии.
+
+        Если новая версия - ровно следующая за известной индексу, других
+        записей не было и индекс остаётся актуальным без перестройки.
+        """
+        with self._lock:
+            if self._versions is None:
+                return
+            if change is None or self._versions[collection] != version - 1:
+                self.invalidate()
+                return
+            if not self._oversized:
+                change()
+            self._versions[collection] = version
+
+    def filter(self, queryset, **criteria):
+        """Выборка, ограниченная условиями match (через индекс или SQL)."""
+        ids = self.match(**criteria)
+        if ids is None:
+            return queryset
+        if self._oversized:
+            return filter_in_db(queryset, **criteria)
+        return filter_by_ids(queryset, ids)
+
+    def match(self, genre_ids=None, all_genres=False, category_ids=None,
+              year_min=None, year_max=None):
+        """Отсортированные id произведений, подходящих под все условия.
+
+        Жанры объединяются по `или` либо, при all_genres, по `и`;
+        None означает, что фильтров нет.
+        """
+        if (genre_ids is None and category_ids is None
+                and year_min is None and year_max is None):
+            return None
+        self.refresh()
+        masks = []
+        with self._lock:
+            if genre_ids is not None:
+                masks.append(reduce(
+                    and_ if all_genres else or_,
+                    [self._genres.get(pk, 0) for pk in genre_ids] or [0]
+                ))
+            if category_ids is not None:
+                masks.append(reduce(or_, (
+                    self._categories.get(pk, 0) for pk in category_ids), 0))
+            if year_min is not None or year_max is not None:
+                masks.append(reduce(or_, (
+                    bits for year, bits in self._years.items()
+                    if (year_min is None or year >= year_min)
+                    and (year_max is None or year <= year_max)
+                ), 0))
+        return bits_to_ids(reduce(and_, masks))
+
+
+title_index = TitleBitmapIndex()
@@ -0,0 +1,198 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from reviews.models import CacheCounter, CollectionVersion
+
+COUNTER_KEY = '{}:{}'
+RESPONSE_KEY = 'api:response:{}:{}'
+
+# Коллекции, версии которых читаются одним запросом к БД.
+COLLECTIONS = ('titles', 'genres', 'categories', 'reviews', 'comments',
+               'users')
+
+# Версии, прочитанные за текущий запрос: имя -> (версия, изменена).
+_snapshot = ContextVar('api_versions', default=None)
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+@contextmanager
+def versions_snapshot():
+    """Версии коллекций читаются из БД один раз на весь блок."""
+    token = _snapshot.set({})
+    try:
+        yield
+    finally:
+        _snapshot.reset(token)
+
+
+def versions_snapshot_middleware(get_response):
+    """Один снимок версий на запрос.
+
+    Ключ кеша, ETag, справочники и индекс фильтров видят одни и те же
+    версии, а таблица версий читается не больше раза за запрос.
+    """
+    def middleware(request):
+        with versions_snapshot():
+            return get_response(request)
+    return middleware
+
+
+def load_versions(*collections):
+    """Версии из БД; недостающие строки создаются.
+
+    Версия стартует с отметки времени, а не с единицы: после очистки
+    таблицы старые записи кеша не совпадут с новой версией.
+    """
+    queryset = CollectionVersion.objects.values_list(
+        'name', 'version', 'modified_at')
+    rows = {name: (version, modified) for name, version, modified in queryset}
+    missing = [name for name in collections if name not in rows]
+    if missing:
+        CollectionVersion.objects.bulk_create(
+            (CollectionVersion(name=name, version=time.time_ns())
+             for name in missing),
+            ignore_conflicts=True)
+        rows.update(
+            (name, (version, modified))
+            for name, version, modified in queryset.filter(name__in=missing)
+        )
+    return rows
+
+
+def get_collection_state(collections):
+    snapshot = _snapshot.get()
+    if snapshot is not None and snapshot.keys() >= set(collections):
+        return snapshot
+    rows = load_versions(*COLLECTIONS, *collections)
+    if snapshot is None:
+        return rows
+    for name, row in rows.items():
+        snapshot.setdefault(name, row)
+    return snapshot
+
+
+def get_versions(*collections):
+    """Текущие версии коллекций (titles, reviews, ...).
+
+    Версии хранятся в БД (CollectionVersion), поэтому запись в любом
+    процессе видна всем; за запрос они читаются один раз.
+    """
+    state = get_collection_state(collections)
+    return [state[name][0] for name in collections]
+
+
+def bump_versions(*collections):
+    """Увеличивает версии коллекций и возвращает новые значения."""
+    now = timezone.now()
+    names = set(collections)
+    queryset = CollectionVersion.objects.filter(name__in=names)
+    with transaction.atomic():
+        if queryset.update(version=F('version') + 1,
+                           modified_at=now) < len(names):
+            # Новая строка начинается с отметки времени - это уже новая
+            # версия, увеличивать её не нужно.
+            load_versions(*names)
+        rows = {name: (version, modified) for name, version, modified
+                in queryset.values_list('name', 'version', 'modified_at')}
+    snapshot = _snapshot.get()
+    if snapshot is not None:
+        snapshot.update(rows)
+    return [rows[name][0] for name in collections]
+
+
+def get_last_modified(*collections):
+    """Время последнего изменения коллекций, в секундах."""
+    state = get_collection_state(collections)
+    return int(max(state[name][1] for name in collections).timestamp())
+
+
+class CacheCounters:
+    """Счётчики попаданий и промахов, общие для процессов (CacheCounter).
+
+    Приращения копятся в процессе и записываются в БД не чаще раза
+    в API_CACHE_STATS_INTERVAL секунд: запись на каждый запрос сделала
+    бы попадание в кеш дороже промаха. Поэтому статистика отстаёт
+    на этот интервал, а при остановке процесса его приращения теряются.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._flushed_at = time.monotonic()
+
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+            self._flushed_at = time.monotonic()
+
+    def incr(self, name):
+        with self._lock:
+            self._pending[name] += 1
+            if (time.monotonic() - self._flushed_at
+                    < settings.API_CACHE_STATS_INTERVAL):
+                return
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._flushed_at = time.monotonic()
+        if not pending:
+            return
+        CacheCounter.objects.bulk_create(
+            (CacheCounter(name=name) for name in pending),
+            ignore_conflicts=True)
+        for name, value in pending.items():
+            CacheCounter.objects.filter(name=name).update(
+                value=F('value') + value)
+
+
+cache_counters = CacheCounters()
+
+
+def incr_counter(prefix, name):
+    cache_counters.incr(COUNTER_KEY.format(prefix, name))
+
+
+def get_counters(prefix, *names):
+    keys = {COUNTER_KEY.format(prefix, name): name for name in names}
+    values = dict(CacheCounter.objects.filter(
+        name__in=keys).values_list('name', 'value'))
+    return {name: values.get(key, 0) for key, name in keys.items()}
+
+
+def get_request_digest(versions, request, kwargs, *extra):
+    """Хеш версий коллекций, адреса и нормализованных параметров.
+
+    Параметры сортируются вместе со значениями, поэтому `?year=1&genre=a`
+    и `?genre=a&year=1` дают один и тот же хеш.
+    """
+    params = sorted(
+        (key, sorted(values))
+        for key, values in request.query_params.lists()
+    )
+    raw = repr((
+        versions,
+        request.build_absolute_uri(request.path),
+        sorted(kwargs.items()),
+        params,
+    ) + extra)
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def get_response_key(prefix, versions, request, kwargs):
+    return RESPONSE_KEY.format(
+        prefix, get_request_digest(versions, request, kwargs))
@@ -0,0 +1,118 @@
+import gzip
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# В порядке предпочтения при равных q.
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def parse_accept_encoding(header):
+    accepted = {}
+    for part in header.split(','):
+        name, _, params = part.partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name.strip():
+            accepted[name.strip().lower()] = quality
+    return accepted
+
+
+def choose_encoding(request):
+    """Лучшее из поддерживаемых сжатий по Accept-Encoding или None."""
+    accepted = parse_accept_encoding(
+        request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    default = accepted.get('*', 0.0)
+    encoding = max(ENCODINGS, key=lambda name: accepted.get(name, default))
+    if accepted.get(encoding, default) <= 0:
+        return None
+    return encoding
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_stream(chunks, encoding):
+    if encoding == 'gzip':
+        yield from compress_sequence(chunks)
+        return
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    for chunk in chunks:
+        # flush после каждой порции, чтобы поток не копился в памяти.
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def weaken_etag(response):
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        # Байты зависят от сжатия, поэтому ETag становится слабым.
+        response['ETag'] = 'W/' + etag
+
+
+def set_encoding_headers(response, encoding):
+    response['Content-Encoding'] = encoding
+    weaken_etag(response)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """gzip (и brotli, если установлен) для ответов от порога размера.
+
+    Кодировка выбирается по Accept-Encoding с учётом q. Готовые сжатые
+    ответы из кеша (`precompressed`, см. CachedResponseMixin) только
+    получают заголовки, а сжатые байты ответов со `store_compressed`
+    передаются ему, чтобы горячие ответы не сжимались повторно.
+    """
+
+    def process_response(self, request, response):
+        if getattr(response, 'precompressed', False):
+            patch_vary_headers(response, ('Accept-Encoding',))
+            set_encoding_headers(response, response['Content-Encoding'])
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request)
+        if encoding is None:
+            return response
+        # Валидатор зависит только от согласования, а не от размера тела:
+        # иначе 304 без тела и сжатый 200 несли бы разные ETag.
+        weaken_etag(response)
+        if (not response.streaming and len(response.content)
+                < settings.API_COMPRESSION_MIN_SIZE):
+            return response
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding)
+            response.headers.pop('Content-Length', None)
+        else:
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+            store = getattr(response, 'store_compressed', None)
+            if store is not None:
+                store(compressed)
+        set_encoding_headers(response, encoding)
+        return response
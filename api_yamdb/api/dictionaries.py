@@ -0,0 +1,88 @@
+import threading
+
+from api.cache import get_versions
+from reviews.models import Category, Genre
+
+
+class ModelDictionary:
+    """Копия маленькой таблицы-справочника в памяти процесса.
+
+    Копия перечитывается, как только версия коллекции в снимке запроса
+    (см. api/cache.py) отличается от версии, с которой она загружена;
+    так данные совпадают с версией в ключе кеша ответа.
+    """
+
+    def __init__(self, model, collection, fields=('name', 'slug')):
+        self.model = model
+        self.collection = collection
+        self.fields = fields
+        self._lock = threading.Lock()
+        self._version = None
+        self._objects = []
+        self._by_id = {}
+        self._by_slug = {}
+        self._positions = {}
+
+    def __deepcopy__(self, memo):
+        # Поля сериализаторов копируются на каждый запрос, а справочник
+        # должен оставаться общим для процесса.
+        return self
+
+    def invalidate(self):
+        self._version = None
+
+    def refresh(self):
+        version, = get_versions(self.collection)
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._load(version)
+
+    def _load(self, version):
+        objects = list(self.model.objects.all())
+        self._by_id = {obj.pk: obj for obj in objects}
+        self._by_slug = {obj.slug: obj for obj in objects}
+        self._positions = {obj.pk: idx for idx, obj in enumerate(objects)}
+        self._objects = objects
+        self._version = version
+
+    def all(self):
+        self.refresh()
+        return list(self._objects)
+
+    def get_by_id(self, pk):
+        self.refresh()
+        return self._by_id.get(pk)
+
+    def get_by_slug(self, slug):
+        self.refresh()
+        obj = self._by_slug.get(slug)
+        if obj is None and self.model.objects.filter(slug=slug).exists():
+            # Запись, версия которой ещё не дошла до этого процесса.
+            with self._lock:
+                self._load(self._version)
+            obj = self._by_slug.get(slug)
+        return obj
+
+    def represent(self, pk):
+        obj = self.get_by_id(pk)
+        if obj is None:
+            return None
+        return {field: getattr(obj, field) for field in self.fields}
+
+    def represent_many(self, pks):
+        """Представления в порядке Meta.ordering модели, как у prefetch."""
+        self.refresh()
+        pks = sorted(
+            (pk for pk in pks if pk in self._positions),
+            key=self._positions.__getitem__,
+        )
+        return [self.represent(pk) for pk in pks]
+
+
+categories = ModelDictionary(Category, 'categories')
+genres = ModelDictionary(Genre, 'genres')
+
+DICTIONARIES = {
+    dictionary.collection: dictionary for dictionary in (categories, genres)
+}
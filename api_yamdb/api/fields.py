@@ -0,0 +1,72 @@
+from rest_framework import serializers
+
+from reviews.models import ScoreDistribution
+
+
+class DictionaryObjectField(serializers.Field):
+    """Вложенный объект справочника по id, без запроса к БД."""
+
+    def __init__(self, dictionary, **kwargs):
+        self.dictionary = dictionary
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return self.dictionary.represent(value)
+
+
+class TitleGenresField(serializers.Field):
+    """Жанры произведения из справочника.
+
+    id жанров берутся из `genre_ids`, которые TitleListSerializer
+    собирает одним запросом на страницу; иначе - запрос к связке.
+    """
+
+    def __init__(self, dictionary, **kwargs):
+        self.dictionary = dictionary
+        kwargs['read_only'] = True
+        kwargs['source'] = '*'
+        super().__init__(**kwargs)
+
+    def to_representation(self, title):
+        genre_ids = getattr(title, 'genre_ids', None)
+        if genre_ids is None:
+            genre_ids = title.genre.through.objects.filter(
+                title_id=title.pk).values_list('genre_id', flat=True)
+        return self.dictionary.represent_many(genre_ids)
+
+
+class DictionarySlugRelatedField(serializers.SlugRelatedField):
+    """SlugRelatedField, который ищет объект в справочнике процесса."""
+
+    def __init__(self, dictionary, **kwargs):
+        self.dictionary = dictionary
+        kwargs['slug_field'] = 'slug'
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        obj = self.dictionary.get_by_slug(data)
+        if obj is None:
+            self.fail('does_not_exist', slug_name=self.slug_field,
+                      value=data)
+        return obj
+
+
+class ScoreDistributionField(serializers.Field):
+    """Гистограмма оценок произведения; без отзывов - нули."""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        kwargs['source'] = '*'
+        super().__init__(**kwargs)
+
+    def to_representation(self, title):
+        distribution = getattr(title, 'score_distribution', None)
+        if distribution is None:
+            distribution = ScoreDistribution(title=title)
+        return {
+            str(score): count
+            for score, count in distribution.as_dict().items()
+        }
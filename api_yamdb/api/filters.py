@@ -1,14 +1,168 @@
+from django.db.models import CharField, Count, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
 from django_filters import rest_framework as filters
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
 
+from api.bitmaps import title_index
+from api.dictionaries import categories, genres
 from reviews.models import Title
+from reviews.search import (TITLE_FTS_RANK, TITLE_FTS_TABLE,
+                            build_match_query, search_words,
+                            title_search_available)
+
+
+GENRE_MODES = (('any', 'any'), ('all', 'all'))
 
 
 class TitleFilter(filters.FilterSet):
+    """Фильтр произведений.
+
+    Жанры (через запятую), категории и годы пересекаются в битовом
+    индексе процесса (api/bitmaps.py), а в SQL уходит только список id;
+    при id больше API_BITMAP_MAX_ID условия выполняются в SQL.
+    """
 
     genre = filters.CharFilter(field_name="genre__slug")
+    genre_mode = filters.ChoiceFilter(choices=GENRE_MODES)
     category = filters.CharFilter(field_name="category__slug")
     name = filters.CharFilter(field_name="name", lookup_expr="icontains")
+    year_min = filters.NumberFilter(field_name="year", lookup_expr="gte")
+    year_max = filters.NumberFilter(field_name="year", lookup_expr="lte")
+
+    INDEXED = ("genre", "genre_mode", "category", "year", "year_min",
+               "year_max")
 
     class Meta:
         model = Title
-        fields = ["genre", "category", "name", "year"]
+        fields = ["genre", "genre_mode", "category", "name", "year",
+                  "year_min", "year_max"]
+
+    @staticmethod
+    def get_ids(dictionary, value):
+        if not value:
+            return None
+        return [getattr(dictionary.get_by_slug(slug), 'pk', None)
+                for slug in value.split(',') if slug]
+
+    def filter_queryset(self, queryset):
+        data = self.form.cleaned_data
+        year_min, year_max = data.get("year_min"), data.get("year_max")
+        if data.get("year") is not None:
+            year_min = max(year_min or data["year"], data["year"])
+            year_max = min(year_max or data["year"], data["year"])
+        category = data.get("category") if "category" in self.INDEXED else None
+        queryset = title_index.filter(
+            queryset,
+            genre_ids=self.get_ids(genres, data.get("genre")),
+            all_genres=data.get("genre_mode") == "all",
+            category_ids=self.get_ids(categories, category),
+            year_min=None if year_min is None else int(year_min),
+            year_max=None if year_max is None else int(year_max),
+        )
+        for name, value in data.items():
+            if name not in self.INDEXED:
+                queryset = self.filters[name].filter(queryset, value)
+        return queryset
+
+
+class TopTitleFilter(TitleFilter):
+    """Фильтр /titles/top/: категория - условием по category_id.
+
+    Так топ категории читается по индексу (category, -weighted_rating),
+    а не перебором списка id из битового индекса.
+    """
+    category = filters.CharFilter(method="filter_category")
+
+    INDEXED = tuple(name for name in TitleFilter.INDEXED
+                    if name != "category")
+
+    def filter_category(self, queryset, name, value):
+        return queryset.filter(
+            category_id__in=self.get_ids(categories, value) or ())
+
+
+class TitleSearchFilter(BaseFilterBackend):
+    """Полнотекстовый поиск `?search=` по названию и описанию.
+
+    Результаты ранжируются по bm25, если клиент не передал `ordering`.
+    Без FTS5-индекса (не SQLite) поиск сводится к icontains.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        words = search_words(request.query_params.get(self.search_param, ''))
+        if not words:
+            return queryset
+        if not title_search_available(queryset.db):
+            condition = Q()
+            for word in words:
+                condition &= (Q(name__icontains=word)
+                              | Q(description__icontains=word))
+            return queryset.filter(condition)
+        match = build_match_query(words)
+        # Индекс присоединяется один раз: MATCH выполняется за запрос,
+        # а ранг берётся из той же строки индекса. Связь задана через
+        # filter, чтобы псевдоним произведений менялся в подзапросах.
+        queryset = queryset.extra(
+            select={'search_rank': TITLE_FTS_RANK},
+            tables=[TITLE_FTS_TABLE],
+            where=[f'{TITLE_FTS_TABLE} MATCH %s'],
+            params=[match],
+        ).filter(id=RawSQL(f'{TITLE_FTS_TABLE}.rowid', ()))
+        if api_settings.ORDERING_PARAM in request.query_params:
+            return queryset
+        return queryset.order_by('search_rank', '-rating', 'id')
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            'name': self.search_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Поиск по названию и описанию (по префиксу).',
+            'schema': {'type': 'string'},
+        }]
+
+
+FACETS = ('genre', 'category', 'year')
+
+
+def get_requested_facets(request):
+    value = request.query_params.get('facets', '')
+    if value.lower() in ('1', 'true', 'all'):
+        return FACETS
+    return tuple(facet for facet in value.split(',') if facet in FACETS)
+
+
+def get_facet_counts(queryset, facets=FACETS):
+    """Количество произведений по жанрам, категориям и годам.
+
+    Все измерения считаются одним запросом UNION ALL по id
+    отфильтрованных произведений, а не отдельным запросом на значение.
+    """
+    ids = queryset.order_by().values('pk')
+    titles = Title.objects.filter(pk__in=ids).order_by()
+    sources = {
+        'genre': (Title.genre.through.objects.filter(
+            title_id__in=ids).order_by(), 'genre__slug'),
+        'category': (titles.filter(category__isnull=False),
+                     'category__slug'),
+        'year': (titles, 'year'),
+    }
+    parts = {}
+    for facet, (source, field) in sources.items():
+        # Все столбцы - аннотации, чтобы порядок совпадал в UNION.
+        parts[facet] = source.annotate(
+            facet=Value(facet, output_field=CharField()),
+            value=Cast(field, CharField()),
+        ).values('facet', 'value').annotate(
+            count=Count('*')
+        ).values_list('facet', 'value', 'count')
+    queries = [parts[facet] for facet in facets]
+    result = {facet: {} for facet in facets}
+    if not queries:
+        return result
+    for facet, value, count in queries[0].union(*queries[1:], all=True):
+        result[facet][value] = count
+    return result
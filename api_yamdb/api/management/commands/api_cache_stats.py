@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from api.cache import get_counters
+
+
+class Command(BaseCommand):
+    help = ('Показывает попадания и промахи кеша ответов API всех процессов '
+            '(с задержкой до API_CACHE_STATS_INTERVAL)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('prefix', nargs='?', default='titles')
+
+    def handle(self, *args, **kwargs):
+        counters = get_counters(kwargs['prefix'], 'hits', 'misses')
+        total = counters['hits'] + counters['misses']
+        ratio = counters['hits'] / total if total else 0
+        self.stdout.write(
+            f"Попаданий: {counters['hits']}, промахов: {counters['misses']}, "
+            f'доля попаданий: {ratio:.1%}'
+        )
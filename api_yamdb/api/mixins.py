@@ -1,7 +1,21 @@
 import re
+from contextlib import contextmanager
 
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
 from rest_framework_simplejwt import serializers
 
+from api.compiled import CompiledSerializer
+from api.compression import choose_encoding
+from api.cache import (get_cache, get_last_modified, get_request_digest,
+                       get_response_key, get_versions, incr_counter)
 from api.utils import ME, PATTERN
 
 
@@ -13,3 +27,276 @@ class ValidateUsername:
                 ['Недопустимый username']
             )
         return value
+
+
+class UniqueConstraintMixin:
+    """Ошибки уникальности из БД вместо проверок exists() перед записью.
+
+    unique_errors - кортежи (поля, ключ ошибки, сообщение). Нарушение
+    ограничения на этих полях становится ValidationError с тем же
+    текстом: запрос-проверка не нужен, и нет гонки между проверкой и
+    вставкой.
+    """
+    unique_errors = ()
+
+    def create(self, validated_data):
+        with self.unique_errors_as_validation():
+            return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        with self.unique_errors_as_validation():
+            return super().update(instance, validated_data)
+
+    @contextmanager
+    def unique_errors_as_validation(self):
+        try:
+            # Точка сохранения, чтобы ошибка не ломала внешнюю транзакцию.
+            with transaction.atomic():
+                yield
+        except IntegrityError as error:
+            message = str(error)
+            opts = self.Meta.model._meta
+            for fields, key, text in self.unique_errors:
+                columns = [opts.get_field(name).column for name in fields]
+                if all(column in message for column in columns):
+                    raise serializers.ValidationError({key: [text]})
+            raise
+
+
+def split_param(value):
+    return {name.strip() for name in (value or '').split(',') if name.strip()}
+
+
+class SparseFieldsMixin:
+    """Набор полей ответа по параметрам `fields`, `omit` и `expand`.
+
+    fields и omit сужают поля Meta.fields, expand добавляет поля из
+    expandable_fields (имя -> (класс поля, kwargs)). Параметры читаются
+    только при чтении и только сериализатором верхнего уровня.
+    prepare_queryset убирает из запроса связи (related_fields) и
+    столбцы (deferred_fields) невыбранных полей, а из присоединённых
+    таблиц читает только related_columns (поле -> пути для only()).
+    """
+    expandable_fields = {}
+    related_fields = {}
+    related_columns = {}
+    deferred_fields = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        names = self.get_requested_fields(self.context.get('request'))
+        for name in names:
+            if name in self.expandable_fields:
+                field_class, field_kwargs = self.expandable_fields[name]
+                self.fields[name] = field_class(**field_kwargs)
+        for name in set(self.fields) - set(names):
+            self.fields.pop(name)
+
+    @classmethod
+    def get_requested_fields(cls, request):
+        names = tuple(cls.Meta.fields)
+        if request is None or request.method not in SAFE_METHODS:
+            return names
+        params = request.query_params
+        selected = set(names)
+        if 'fields' in params:
+            selected = split_param(params['fields'])
+        selected |= split_param(params.get('expand'))
+        selected -= split_param(params.get('omit'))
+        return tuple(
+            name for name in names + tuple(cls.expandable_fields)
+            if name in selected
+        )
+
+    @classmethod
+    def prepare_queryset(cls, queryset, request):
+        names = cls.get_requested_fields(request)
+        related = [cls.related_fields[name] for name in names
+                   if name in cls.related_fields]
+        if related:
+            queryset = queryset.select_related(*related)
+        columns = [column for name in names
+                   for column in cls.related_columns.get(name, ())]
+        if columns:
+            queryset = queryset.only(*(
+                field.name for field in cls.Meta.model._meta.concrete_fields
+            ), *columns)
+        deferred = [name for name in cls.deferred_fields if name not in names]
+        if deferred:
+            queryset = queryset.defer(*deferred)
+        return queryset
+
+
+class SparseFieldsQuerysetMixin:
+    """Подготавливает queryset под поля сериализатора (SparseFieldsMixin)."""
+
+    def get_queryset(self):
+        return self.prepare_queryset(super().get_queryset())
+
+    def prepare_queryset(self, queryset):
+        serializer_class = self.get_serializer_class()
+        if issubclass(serializer_class, SparseFieldsMixin):
+            queryset = serializer_class.prepare_queryset(
+                queryset, self.request)
+        return queryset
+
+
+class CompiledListMixin:
+    """list через CompiledSerializer: страница читается values().
+
+    Модели не создаются, а поля DRF не обходятся; если сериализатор
+    содержит неподдерживаемые поля, используется обычный list.
+    """
+
+    def list(self, request, *args, **kwargs):
+        compiled = CompiledSerializer.compile(
+            self.get_serializer(many=True).child)
+        if compiled is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(
+            self.get_queryset()).values(*compiled.columns)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(compiled.represent(page))
+        return Response(compiled.represent(queryset))
+
+
+class NestedParentMixin:
+    """Вложенный маршрут без отдельного запроса родителя на чтение.
+
+    Дочерний queryset фильтруется по id из URL (parent_filters: поле ->
+    kwarg URL). Родитель (parent_model по parent_lookups) загружается не
+    больше раза за запрос: для записи или когда выборка пуста и нужно
+    отличить пустой список от 404 несуществующего родителя.
+    """
+    parent_model = None
+    parent_lookups = {}
+    parent_filters = {}
+    _parent = None
+
+    def get_queryset(self):
+        return super().get_queryset().filter(**{
+            field: self.kwargs.get(kwarg)
+            for field, kwarg in self.parent_filters.items()
+        })
+
+    def get_parent_lookups(self):
+        return {field: self.kwargs.get(kwarg)
+                for field, kwarg in self.parent_lookups.items()}
+
+    def get_parent(self):
+        if self._parent is None:
+            self._parent = get_object_or_404(
+                self.parent_model, **self.get_parent_lookups())
+        return self._parent
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            self.get_parent()
+            raise
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page:
+            self.get_parent()
+        return page
+
+
+class CachedResponseMixin:
+    """Кеширует ответы list/retrieve до изменения связанных коллекций.
+
+    Ключ строится из версий `cache_collections` и нормализованных
+    параметров запроса; запись в любую из коллекций поднимает версию
+    (см. api/signals.py), и старые записи просто перестают читаться.
+    """
+    cache_prefix = None
+    cache_collections = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs)
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        cache = get_cache()
+        key = get_response_key(
+            self.cache_prefix, get_versions(*self.cache_collections),
+            request, kwargs)
+        # Сжатые байты кешируются только для JSON: HTML browsable API
+        # зависит от пользователя.
+        encoding = None
+        if request.accepted_renderer.format == 'json':
+            encoding = choose_encoding(request)
+        body_key = f'{key}:{request.accepted_media_type}:{encoding}'
+        if encoding is not None:
+            body = cache.get(body_key)
+            if body is not None:
+                incr_counter(self.cache_prefix, 'hits')
+                return self.get_precompressed_response(*body, encoding)
+        data = cache.get(key)
+        if data is not None:
+            incr_counter(self.cache_prefix, 'hits')
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+        else:
+            incr_counter(self.cache_prefix, 'misses')
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+            response['X-Cache'] = 'MISS'
+        if encoding is not None:
+            response.store_compressed = lambda compressed: cache.set(
+                body_key, (response['Content-Type'], compressed),
+                settings.API_CACHE_TIMEOUT)
+        return response
+
+    @staticmethod
+    def get_precompressed_response(content_type, body, encoding):
+        response = HttpResponse(body, content_type=content_type)
+        response['Content-Encoding'] = encoding
+        response['X-Cache'] = 'HIT'
+        response.precompressed = True
+        return response
+
+
+class ConditionalListMixin:
+    """ETag и Last-Modified для list по версиям коллекций.
+
+    Валидаторы считаются до обращения к БД, поэтому ответ 304 на
+    If-None-Match/If-Modified-Since не выполняет ни запрос, ни
+    сериализацию. ETag строгий: при тех же версиях, параметрах и формате
+    ответ совпадает побайтно.
+    """
+    cache_collections = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().list, request, *args, **kwargs)
+
+    def get_conditional_response(self, handler, request, *args, **kwargs):
+        etag = quote_etag(get_request_digest(
+            get_versions(*self.cache_collections), request, kwargs,
+            request.accepted_media_type))
+        last_modified = get_last_modified(*self.cache_collections)
+        response = get_conditional_response(
+            request._request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class ConditionalGetMixin(ConditionalListMixin):
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,240 @@
+import json
+from base64 import b64decode, b64encode
+from binascii import Error as BinasciiError
+
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Пагинация по ключу (ordering..., id) без OFFSET и COUNT(*).
+
+    Курсор хранит значения ключа последнего элемента страницы, поэтому
+    стоимость страницы не зависит от её номера, а новые записи не сдвигают
+    уже отданные. NULL-значения всегда идут в конце выдачи.
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    ordering = ('-id',)
+    # Поле выдачи -> путь для ORM. Пустой словарь - только `ordering`.
+    ordering_fields = {}
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.keys = self.get_keys(request, queryset, view)
+        position, self.reverse = self.decode_cursor(request)
+
+        queryset = self.select_keys(queryset).order_by(
+            *self.get_order_by(self.reverse))
+        if position is not None:
+            queryset = queryset.filter(self.get_position_filter(position))
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_keys(self, request, queryset, view):
+        ordering = None
+        if view is not None and OrderingFilter in getattr(
+                view, 'filter_backends', ()):
+            ordering = OrderingFilter().get_ordering(request, queryset, view)
+        keys = []
+        for term in ordering or self.ordering:
+            name = term.lstrip('-')
+            if name == 'id':
+                path = 'id'
+            elif name in self.ordering_fields:
+                path = self.ordering_fields[name]
+            elif not self.ordering_fields and term in self.ordering:
+                path = name
+            else:
+                raise ValidationError({'ordering': [
+                    f'Сортировка по `{name}` недоступна при пагинации '
+                    'курсором.'
+                ]})
+            keys.append((path, term.startswith('-'),
+                         self.is_nullable(queryset.model, path)))
+        if not any(path == 'id' for path, _, _ in keys):
+            keys.append(('id', False, False))
+        return keys
+
+    def select_keys(self, queryset):
+        """Добавляет к выборке values() столбцы ключа для курсора."""
+        selected = queryset.query.values_select
+        missing = [path for path, _, _ in self.keys if path not in selected]
+        if not selected or not missing:
+            return queryset
+        return queryset.values(*selected, *missing)
+
+    def get_key_terms(self):
+        return [f'-{path}' if descending else path
+                for path, descending, _ in self.keys]
+
+    @staticmethod
+    def is_nullable(model, path):
+        for name in path.split('__'):
+            field = model._meta.get_field(name)
+            if field.null:
+                return True
+            model = field.related_model
+        return False
+
+    def get_order_by(self, reverse):
+        nulls = {'nulls_first': True} if reverse else {'nulls_last': True}
+        order_by = []
+        for path, descending, _ in self.keys:
+            expression = F(path)
+            order_by.append(expression.desc(**nulls) if descending != reverse
+                            else expression.asc(**nulls))
+        return order_by
+
+    def get_position_filter(self, position):
+        """Строки строго после (или до, при обратном курсоре) позиции."""
+        result = Q(pk__in=[])
+        equal = Q()
+        for (path, descending, nullable), value in zip(self.keys, position):
+            if value is None:
+                beyond = (Q(**{f'{path}__isnull': False}) if self.reverse
+                          else Q(pk__in=[]))
+                same = Q(**{f'{path}__isnull': True})
+            else:
+                lookup = 'lt' if descending != self.reverse else 'gt'
+                beyond = Q(**{f'{path}__{lookup}': value})
+                if nullable and not self.reverse:
+                    beyond |= Q(**{f'{path}__isnull': True})
+                same = Q(**{path: value})
+            result |= equal & beyond
+            equal &= same
+        return result
+
+    def get_position(self, instance):
+        position = []
+        for path, _, _ in self.keys:
+            if isinstance(instance, dict):
+                value = instance[path]
+            else:
+                value = instance
+                for name in path.split('__'):
+                    value = getattr(value, name, None)
+                    if value is None:
+                        break
+            if hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            position.append(value)
+        return position
+
+    def encode_cursor(self, instance, reverse):
+        payload = {
+            'k': self.get_key_terms(),
+            'p': self.get_position(instance),
+        }
+        if reverse:
+            payload['r'] = 1
+        cursor = b64encode(
+            json.dumps(payload, separators=(',', ':')).encode(),
+            altchars=b'-_',
+        ).decode()
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(b64decode(encoded, altchars=b'-_'))
+            keys, position = payload['k'], payload['p']
+            reverse = bool(payload.get('r'))
+        except (BinasciiError, UnicodeDecodeError, ValueError, TypeError,
+                KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if (keys != self.get_key_terms() or not isinstance(position, list)
+                or len(position) != len(self.keys)):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            'name': self.cursor_query_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Курсор страницы.',
+            'schema': {'type': 'string'},
+        }]
+
+
+class CursorOrPageNumberPagination(PageNumberPagination):
+    """Постраничная пагинация, а при наличии `?cursor=` - по ключу."""
+    cursor_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        cursor_param = self.cursor_pagination_class.cursor_query_param
+        if cursor_param in request.query_params:
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        return (super().get_schema_operation_parameters(view)
+                + self.cursor_pagination_class().
+                get_schema_operation_parameters(view))
+
+
+class TitleKeysetPagination(KeysetPagination):
+    ordering = ('-rating',)
+    ordering_fields = {
+        'rating': 'rating',
+        'name': 'name',
+        'year': 'year',
+        'category': 'category__name',
+    }
+
+
+class TitlePagination(CursorOrPageNumberPagination):
+    cursor_pagination_class = TitleKeysetPagination
+
+
+class PubDateKeysetPagination(KeysetPagination):
+    ordering = ('-pub_date', '-id')
+
+
+class PubDatePagination(CursorOrPageNumberPagination):
+    cursor_pagination_class = PubDateKeysetPagination
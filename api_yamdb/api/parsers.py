@@ -0,0 +1,68 @@
+import codecs
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data):
+    """json.loads на orjson, если он установлен (NaN и Infinity - ошибка)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data, parse_constant=reject_constant)
+
+
+def reject_constant(value):
+    raise ValueError(f'Недопустимое значение {value}')
+
+
+def is_utf8(encoding):
+    try:
+        return codecs.lookup(encoding).name == 'utf-8'
+    except LookupError:
+        return False
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser, который разбирает тело без декодирования в строку.
+
+    orjson принимает только UTF-8; для других кодировок и без orjson
+    работает стандартный JSONParser.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or not is_utf8(encoding):
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except ValueError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+class NDJSONParser(BaseParser):
+    """Построчный JSON: по одному объекту на строку, пустые пропускаются."""
+
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        items = []
+        for number, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                items.append(loads(line.decode(encoding)))
+            except ValueError as exc:
+                raise ParseError(
+                    f'Некорректный JSON в строке {number}: {exc}')
+        return items
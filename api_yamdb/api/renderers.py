@@ -0,0 +1,36 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z if orjson is not None else 0
+)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer на orjson, если он установлен.
+
+    Вывод совпадает со стандартным компактным JSON: UTF-8 без
+    экранирования, U+2028/U+2029 экранируются, datetime - в ISO 8601
+    с `Z`, как у DateTimeField. С отступами (browsable API), при
+    ensure_ascii и без orjson работает стандартный JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if (orjson is None or indent is not None or not self.compact
+                or self.ensure_ascii):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default,
+                               option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # Например, целые больше 64 бит: их умеет только json.
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+            b'\xe2\x80\xa9', b'\\u2029')
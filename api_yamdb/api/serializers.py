@@ -1,17 +1,42 @@
 import datetime
 import re
+from collections import Counter, defaultdict
+from functools import partial
 
 from django.contrib.auth.tokens import default_token_generator
+from django.db import transaction
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 from reviews.models import (ADMIN, MODERATOR, USER, Category, Comment, Genre,
-                            Review, Title, User)
-
-from .mixins import ValidateUsername
+                            Review, ScoreDistribution, Title, User)
+
+from .dictionaries import categories, genres
+from .fields import (DictionaryObjectField, DictionarySlugRelatedField,
+                     ScoreDistributionField, TitleGenresField)
+from .mixins import (SparseFieldsMixin, UniqueConstraintMixin,
+                     ValidateUsername)
+from .signals import bump_collection
 from .utils import (EMAIL_MAX_LENGTH, MAX_LENGTH_255, NAME_MAX_LENGTH,
                     PATTERN_SLUG, SLUG_LEN)
 
 
+def get_users_by_username_or_email(username, email):
+    """Пользователи с этим username или email одним запросом.
+
+    Оба поля уникальны, так что строк не больше двух.
+    """
+    conditions = Q()
+    if username is not None:
+        conditions |= Q(username=username)
+    if email is not None:
+        conditions |= Q(email=email)
+    if not conditions:
+        return []
+    return list(User.objects.filter(conditions))
+
+
 class UserSerializer(serializers.ModelSerializer, ValidateUsername):
     username = serializers.CharField(max_length=NAME_MAX_LENGTH)
     email = serializers.EmailField(max_length=EMAIL_MAX_LENGTH)
@@ -33,31 +58,19 @@ class UserSerializer(serializers.ModelSerializer, ValidateUsername):
             return value
         raise serializers.ValidationError(['Нет такой роли!'])
 
-    def validate_email(self, value):
-        view = self.context.get('view')
-
-        if view:
-            username_from_url = view.kwargs.get('username')
-            user_from_url = User.objects.filter(
-                email=value, username=username_from_url
-            )
-            if user_from_url.exists():
-                return value
-
-        user = User.objects.filter(
-            email=value
-        )
-        if user.exists():
-            raise serializers.ValidationError(
-                ['email уже занят']
-            )
-        return value
-
     def validate(self, data):
-        user = User.objects.filter(
-            username=data.get('username')
-        )
-        if user.exists():
+        username = data.get('username')
+        email = data.get('email')
+        users = get_users_by_username_or_email(username, email)
+        owner = next((user for user in users if user.email == email), None)
+        if owner is not None:
+            view = self.context.get('view')
+            username_from_url = view.kwargs.get('username') if view else None
+            if owner.username != username_from_url:
+                raise serializers.ValidationError(
+                    {'email': ['email уже занят']}
+                )
+        if any(user.username == username for user in users):
             raise serializers.ValidationError(
                 ['username уже занят']
             )
@@ -72,22 +85,16 @@ class RegisterSerializer(serializers.Serializer, ValidateUsername):
 
         email = data.get('email')
         username = data.get('username')
-        data['exists'] = False
-        user = User.objects.filter(
-            username=username, email=email
-        )
-        if user.exists():
-            user = User.objects.get(
-                username=username, email=email
-            )
-            token = default_token_generator.make_token(user)
-            data['token'] = token
-            data['exists'] = True
-            return data
-        if User.objects.filter(username=username).exists():
+        users = get_users_by_username_or_email(username, email)
+        for user in users:
+            if user.username == username and user.email == email:
+                data['token'] = default_token_generator.make_token(user)
+                data['exists'] = True
+                return data
+        if any(user.username == username for user in users):
             raise serializers.ValidationError(
                 ['Пользователь с таким именем уже существует.'])
-        if User.objects.filter(email=email).exists():
+        if users:
             raise serializers.ValidationError(
                 ['Пользователь с такой почтой уже существует.'])
         data['exists'] = False
@@ -116,7 +123,7 @@ class TokenSerializer(serializers.Serializer):
         return data
 
 
-class CatGenreSerializer(serializers.ModelSerializer):
+class CatGenreSerializer(UniqueConstraintMixin, serializers.ModelSerializer):
     slug = serializers.SlugField(
         max_length=SLUG_LEN,
         required=True)
@@ -128,17 +135,12 @@ class CatGenreSerializer(serializers.ModelSerializer):
 
 class CategorySerializer(CatGenreSerializer):
 
+    unique_errors = ((('slug',), 'slug', 'Такая категория уже есть'),)
+
     class Meta(CatGenreSerializer.Meta):
         model = Category
 
     def validate_slug(self, value):
-        category = Category.objects.filter(
-            slug=value
-        )
-        if category.exists():
-            raise serializers.ValidationError(
-                ['Такая категория уже есть']
-            )
         if re.match(PATTERN_SLUG, value):
             return value
         raise serializers.ValidationError(
@@ -148,17 +150,12 @@ class CategorySerializer(CatGenreSerializer):
 
 class GenreSerializer(CatGenreSerializer):
 
+    unique_errors = ((('slug',), 'slug', 'Такой жанр уже есть'),)
+
     class Meta(CatGenreSerializer.Meta):
         model = Genre
 
     def validate_slug(self, value):
-        genre = Genre.objects.filter(
-            slug=value
-        )
-        if genre.exists():
-            raise serializers.ValidationError(
-                ['Такой жанр уже есть']
-            )
         if re.match(PATTERN_SLUG, value):
             return value
         raise serializers.ValidationError(
@@ -166,25 +163,73 @@ class GenreSerializer(CatGenreSerializer):
         )
 
 
-class TitleSerializer(serializers.ModelSerializer):
-    genre = GenreSerializer(many=True, required=True)
-    category = CategorySerializer(required=True)
+class TitleListSerializer(serializers.ListSerializer):
+
+    def to_representation(self, data):
+        titles = list(data)
+        if 'genre' not in self.child.fields:
+            return super().to_representation(titles)
+        genre_ids = {title.pk: [] for title in titles}
+        for title_id, genre_id in Title.genre.through.objects.filter(
+            title_id__in=genre_ids
+        ).values_list('title_id', 'genre_id'):
+            genre_ids[title_id].append(genre_id)
+        for title in titles:
+            title.genre_ids = genre_ids[title.pk]
+        return super().to_representation(titles)
+
+
+class TitleShortSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = Title
+        fields = ('id', 'name', 'year')
+
+
+class TitleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    genre = TitleGenresField(genres)
+    category = DictionaryObjectField(categories, source='category_id')
     rating = serializers.IntegerField(default=0, read_only=True)
 
+    expandable_fields = {'score_distribution': (ScoreDistributionField, {})}
+    related_fields = {'score_distribution': 'score_distribution'}
+    deferred_fields = ('description',)
+
     class Meta:
         model = Title
         fields = ('id', 'name', 'year', 'rating',
                   'description', 'genre', 'category',
                   )
+        list_serializer_class = TitleListSerializer
+
+
+class TopTitleSerializer(TitleSerializer):
+    weighted_rating = serializers.FloatField(read_only=True)
+
+    class Meta(TitleSerializer.Meta):
+        fields = TitleSerializer.Meta.fields + ('weighted_rating',)
+
+
+class ScoreDistributionSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source='title_id')
+    rating = serializers.FloatField(source='title.rating')
+    review_count = serializers.IntegerField(source='title.review_count')
+    score_distribution = serializers.DictField(
+        source='as_dict', child=serializers.IntegerField())
+
+    class Meta:
+        model = ScoreDistribution
+        fields = ('id', 'rating', 'review_count', 'score_distribution')
+        read_only_fields = fields
 
 
 class TitleWriteSerializer(serializers.ModelSerializer):
-    category = serializers.SlugRelatedField(
-        slug_field='slug', queryset=Category.objects.all(), required=True,
+    category = DictionarySlugRelatedField(
+        categories, queryset=Category.objects.all(), required=True,
     )
-    genre = serializers.SlugRelatedField(
+    genre = DictionarySlugRelatedField(
+        genres,
         required=True,
-        slug_field='slug',
         many=True,
         queryset=Genre.objects.all(),
         allow_null=False
@@ -201,43 +246,148 @@ class TitleWriteSerializer(serializers.ModelSerializer):
         return TitleSerializer(instance).data
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class TitleBulkListSerializer(serializers.ListSerializer):
+    """Пакетная запись произведений.
+
+    id обновляемых произведений проверяются одним запросом.
+    """
+
+    def to_internal_value(self, data):
+        ids = Counter()
+        if isinstance(data, list):
+            id_field = self.child.fields['id']
+            for item in data:
+                if isinstance(item, dict) and 'id' in item:
+                    try:
+                        ids[id_field.to_internal_value(item['id'])] += 1
+                    except serializers.ValidationError:
+                        pass
+        self.context.update(
+            existing_ids=set(Title.objects.filter(
+                pk__in=ids).values_list('pk', flat=True)),
+            duplicate_ids={pk for pk, count in ids.items() if count > 1},
+        )
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        """Вставляет новые и обновляет существующие произведения.
+
+        У существующих меняются только поля, переданные в элементе.
+        bulk_create и bulk_update не шлют сигналов, поэтому версия
+        коллекции сдвигается здесь же; поисковый индекс FTS5
+        обновляется триггерами БД.
+        """
+        through = Title.genre.through
+        titles, genre_links = [], []
+        updates = defaultdict(list)
+        for item in validated_data:
+            item = dict(item)
+            genre_ids = {genre.pk for genre in item.pop('genre')}
+            title = Title(**item)
+            titles.append(title)
+            genre_links.append(genre_ids)
+            if title.pk is not None:
+                updates[tuple(sorted(item.keys() - {'id'}))].append(title)
+        new = [title for title in titles if title.pk is None]
+        changed = [title for title in titles if title.pk is not None]
+        with transaction.atomic():
+            Title.objects.bulk_create(new)
+            for fields, group in updates.items():
+                Title.objects.bulk_update(group, fields)
+            # Связи обновлённых произведений заменяются целиком.
+            through.objects.filter(
+                title_id__in=[title.pk for title in changed]).delete()
+            through.objects.bulk_create(
+                through(title_id=title.pk, genre_id=genre_id)
+                for title, genre_ids in zip(titles, genre_links)
+                for genre_id in genre_ids
+            )
+            transaction.on_commit(partial(bump_collection, 'titles'))
+        return titles
 
-    author = serializers.SlugRelatedField(
-        slug_field='username',
-        read_only=True
-    )
+
+class TitleBulkSerializer(TitleWriteSerializer):
+    """Элемент пакета: с `id` - обновление произведения, без - создание."""
+
+    id = serializers.IntegerField(required=False)
+
+    class Meta(TitleWriteSerializer.Meta):
+        list_serializer_class = TitleBulkListSerializer
+
+    def validate_id(self, value):
+        if value not in self.context.get('existing_ids', ()):
+            raise serializers.ValidationError(
+                'Произведение с таким id не найдено.')
+        if value in self.context.get('duplicate_ids', ()):
+            raise serializers.ValidationError(
+                'id повторяется в пакете.')
+        return value
+
+
+class ReviewShortSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Review
-        fields = ('id', 'text', 'score', 'author', 'pub_date')
+        fields = ('id', 'score', 'pub_date')
 
-    def validate(self, data):
-        request = self.context.get('request')
-        view = self.context.get('view')
 
-        if request and view:
-            title_id = view.kwargs.get('title_id')
+class ReviewSerializer(SparseFieldsMixin, UniqueConstraintMixin,
+                       serializers.ModelSerializer):
 
-            if Review.objects.filter(
-                author=request.user,
-                title_id=title_id
-            ).exists() and request.method == 'POST':
-                raise serializers.ValidationError(
-                    ['Вы уже оставляли отзыв на это произведение.']
-                )
+    author = serializers.SlugRelatedField(
+        slug_field='username',
+        read_only=True
+    )
 
-        return data
+    expandable_fields = {'title': (TitleShortSerializer, {'read_only': True})}
+    related_fields = {'author': 'author', 'title': 'title'}
+    related_columns = {'author': ('author__username',)}
+    deferred_fields = ('text',)
+
+    unique_errors = ((
+        ('author', 'title'), api_settings.NON_FIELD_ERRORS_KEY,
+        'Вы уже оставляли отзыв на это произведение.'
+    ),)
+
+    class Meta:
+        model = Review
+        fields = ('id', 'text', 'score', 'author', 'pub_date',
+                  'comments_count')
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
 
     author = serializers.SlugRelatedField(
         slug_field='username',
         read_only=True
     )
 
+    expandable_fields = {
+        'review': (ReviewShortSerializer, {'read_only': True})
+    }
+    related_fields = {'author': 'author', 'review': 'review'}
+    related_columns = {'author': ('author__username',)}
+    deferred_fields = ('text',)
+
     class Meta:
         model = Comment
         fields = ('id', 'text', 'author', 'pub_date')
         read_only_fields = ('review',)
+
+
+class ReviewExportSerializer(ReviewSerializer):
+    title = serializers.IntegerField(source='title_id', read_only=True)
+
+    expandable_fields = {}
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ('title',)
+
+
+class CommentExportSerializer(CommentSerializer):
+    review = serializers.IntegerField(source='review_id', read_only=True)
+
+    expandable_fields = {}
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ('review',)
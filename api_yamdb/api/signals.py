@@ -0,0 +1,45 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from api.bitmaps import title_index
+from api.cache import bump_versions
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+MODEL_COLLECTIONS = {
+    Title: 'titles',
+    Title.genre.through: 'titles',
+    Genre: 'genres',
+    Category: 'categories',
+    Review: 'reviews',
+    Comment: 'comments',
+    User: 'users',
+}
+
+
+def bump_collection_version(sender, **kwargs):
+    collection = MODEL_COLLECTIONS[sender]
+    if kwargs.get('action', 'post_').startswith('post_'):
+        change = None
+        if collection in title_index.collections:
+            change = title_index.get_change(sender, **kwargs)
+        # После коммита, чтобы другие процессы не закешировали старые
+        # данные под новой версией.
+        transaction.on_commit(partial(bump_collection, collection, change))
+
+
+# Обработчик подключается к каждой модели отдельно: без sender
+# post_delete слушали бы все модели, и Django не удалял бы их строки
+# одним запросом (fast delete). Связи жанров меняются через m2m_changed.
+for model in MODEL_COLLECTIONS:
+    for signal in ((m2m_changed,) if model._meta.auto_created
+                   else (post_save, post_delete)):
+        signal.connect(bump_collection_version, sender=model,
+                       dispatch_uid=f'bump_collection_version:{model}')
+
+
+def bump_collection(collection, change=None):
+    version, = bump_versions(collection)
+    if collection in title_index.collections:
+        title_index.apply(collection, version, change)
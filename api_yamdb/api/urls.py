@@ -1,9 +1,10 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    RegisterApiView, ReviewViewSet, TitleViewSet, TokenApiView,
-                    UserViewSet)
+from .views import (CategoryViewSet, CommentExportApiView, CommentViewSet,
+                    GenreViewSet, RegisterApiView, ReviewExportApiView,
+                    ReviewViewSet, TitleExportApiView, TitleViewSet,
+                    TokenApiView, UserViewSet)
 
 router_v1 = DefaultRouter()
 router_v1.register('users', UserViewSet, basename="users")
@@ -25,6 +26,12 @@ v1_urls = [
     path('', include(router_v1.urls)),
     path('auth/signup/', RegisterApiView.as_view(), name='signup'),
     path('auth/token/', TokenApiView.as_view(), name='token'),
+    path('export/titles/', TitleExportApiView.as_view(),
+         name='export-titles'),
+    path('export/reviews/', ReviewExportApiView.as_view(),
+         name='export-reviews'),
+    path('export/comments/', CommentExportApiView.as_view(),
+         name='export-comments'),
 ]
 
 urlpatterns = [
@@ -10,3 +10,14 @@ CAT_GENRE_NAME = 256
 SLUG_LEN = 50
 MIN_SCORE = 1
 MAX_SCORE = 10
+RATING_MIN_REVIEWS = 5
+RATING_PRIOR_TOLERANCE = 0.05
+TOP_TITLES_LIMIT = 10
+TOP_TITLES_MAX_LIMIT = 100
+BULK_TITLES_MAX_SIZE = 1000
+EXPORT_CHUNK_SIZE = 2000
+EMAIL_BATCH_SIZE = 100
+EMAIL_MAX_ATTEMPTS = 6
+EMAIL_RETRY_DELAY = 30
+EMAIL_RETRY_MAX_DELAY = 60 * 60
+EMAIL_LEASE = 60 * 5
@@ -1,25 +1,46 @@
+from functools import partial
+from itertools import islice
+
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django_filters.rest_framework import DjangoFilterBackend
+from django_filters.utils import translate_validation
 from rest_framework import filters, generics, mixins, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework_simplejwt.tokens import RefreshToken
 
 
-from api.filters import TitleFilter
-from api_yamdb.settings import DEFAULT_FROM_EMAIL
+from api.filters import (TitleFilter, TitleSearchFilter, TopTitleFilter,
+                         get_facet_counts, get_requested_facets)
+from .compiled import CompiledSerializer
+from .dictionaries import categories, genres
+from .mixins import (CachedResponseMixin, CompiledListMixin,
+                     ConditionalGetMixin, ConditionalListMixin,
+                     NestedParentMixin, SparseFieldsQuerysetMixin)
+from .pagination import PubDatePagination, TitlePagination
+from .parsers import FastJSONParser, NDJSONParser
 from .permissions import IsAdmin, IsAdminOrReadOnly, IsUser, IsUserOrStaff
-from reviews.models import Category, Genre, Review, Title, User
-from .serializers import (CategorySerializer, CommentSerializer,
-                          GenreSerializer, RegisterSerializer,
-                          ReviewSerializer, TitleSerializer,
+from .renderers import FastJSONRenderer
+from reviews.mail import queue_email
+from reviews.models import (Category, Comment, Genre, Review,
+                            ScoreDistribution, Title, User)
+from .serializers import (CategorySerializer, CommentExportSerializer,
+                          CommentSerializer, GenreSerializer,
+                          RegisterSerializer, ReviewExportSerializer,
+                          ReviewSerializer, ScoreDistributionSerializer,
+                          TitleBulkSerializer, TitleSerializer,
                           TitleWriteSerializer, TokenSerializer,
-                          UserSerializer)
+                          TopTitleSerializer, UserSerializer)
+from .utils import (BULK_TITLES_MAX_SIZE, EXPORT_CHUNK_SIZE,
+                    TOP_TITLES_LIMIT, TOP_TITLES_MAX_LIMIT)
 
 
 class RegisterApiView(generics.CreateAPIView):
@@ -35,13 +56,11 @@ class RegisterApiView(generics.CreateAPIView):
         if not serializer.validated_data.get('exists'):
             user = User.objects.create(username=username, email=email)
             token = default_token_generator.make_token(user)
-        send_mail(
+        queue_email(
             subject='Registration',
-            message=f'Здравствуйте {username}! '
-                    f'Ваш код подтверждения: {token}',
-            from_email=DEFAULT_FROM_EMAIL,
-            recipient_list=[email],
-            fail_silently=True,
+            body=f'Здравствуйте {username}! '
+                 f'Ваш код подтверждения: {token}',
+            to=email,
         )
 
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -96,7 +115,8 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class CatGenreViewSet(mixins.ListModelMixin,
+class CatGenreViewSet(ConditionalListMixin,
+                      mixins.ListModelMixin,
                       mixins.CreateModelMixin,
                       mixins.DestroyModelMixin,
                       viewsets.GenericViewSet):
@@ -105,71 +125,233 @@ class CatGenreViewSet(mixins.ListModelMixin,
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name', )
     lookup_field = 'slug'
+    dictionary = None
+
+    def filter_queryset(self, queryset):
+        search = api_settings.SEARCH_PARAM in self.request.query_params
+        if self.action == 'list' and not search:
+            return self.dictionary.all()
+        return super().filter_queryset(queryset)
 
 
 class CategoryViewSet(CatGenreViewSet):
     serializer_class = CategorySerializer
     queryset = Category.objects.all()
+    cache_collections = ('categories',)
+    dictionary = categories
 
 
 class GenreViewSet(CatGenreViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_collections = ('genres',)
+    dictionary = genres
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')).order_by('-rating')
+class TitleViewSet(ConditionalGetMixin, CachedResponseMixin,
+                   SparseFieldsQuerysetMixin, CompiledListMixin,
+                   viewsets.ModelViewSet):
+    queryset = Title.objects.order_by('-rating', 'id')
     permission_classes = (IsAdminOrReadOnly,)
-    pagination_class = PageNumberPagination
+    pagination_class = TitlePagination
     lookup_field = 'id'
+    lookup_value_regex = r'\d+'
     http_method_names = ['get', 'post', 'patch', 'delete']
-    filter_backends = (DjangoFilterBackend, filters.OrderingFilter)
+    filter_backends = (DjangoFilterBackend, filters.OrderingFilter,
+                       TitleSearchFilter)
     filterset_class = TitleFilter
-    ordering_fields = ['name', 'year', 'genre', 'category']
+    ordering_fields = ['rating', 'name', 'year', 'genre', 'category']
+    cache_prefix = 'titles'
+    cache_collections = ('titles', 'genres', 'categories', 'reviews')
+
+    def paginate_queryset(self, queryset):
+        self.facets = None
+        facets = get_requested_facets(self.request)
+        if self.action == 'list' and facets:
+            self.facets = get_facet_counts(queryset, facets)
+        return super().paginate_queryset(queryset)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.facets is not None:
+            response.data['facets'] = self.facets
+        return response
 
     def get_serializer_class(self):
+        if self.action == 'bulk':
+            return TitleBulkSerializer
         if self.request.method in ['POST', 'PATCH', 'DELETE']:
             return TitleWriteSerializer
+        if self.action == 'top':
+            return TopTitleSerializer
         return TitleSerializer
 
-
-class ReviewViewSet(viewsets.ModelViewSet):
+    @action(detail=False, url_path='top')
+    def top(self, request):
+        return self.get_conditional_response(
+            partial(self.get_cached_response, self.get_top), request)
+
+    def get_top(self, request):
+        try:
+            limit = int(request.query_params.get('limit', TOP_TITLES_LIMIT))
+        except ValueError:
+            raise ValidationError({'limit': ['Ожидается целое число.']})
+        limit = max(1, min(limit, TOP_TITLES_MAX_LIMIT))
+        filterset = TopTitleFilter(
+            request.query_params,
+            queryset=self.prepare_queryset(
+                Title.objects.filter(weighted_rating__isnull=False)),
+            request=request,
+        )
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        queryset = filterset.qs.order_by('-weighted_rating', 'id')[:limit]
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['post'], url_path='bulk',
+            parser_classes=(FastJSONParser, NDJSONParser))
+    def bulk(self, request):
+        """Пакетное создание и обновление произведений.
+
+        Принимает JSON-массив или NDJSON. Пакет записывается целиком
+        или не записывается вовсе; ошибки возвращаются по индексам.
+        """
+        serializer = self.get_serializer(
+            data=request.data, many=True, allow_empty=False,
+            max_length=BULK_TITLES_MAX_SIZE)
+        if not serializer.is_valid():
+            errors = serializer.errors
+            if isinstance(errors, list):
+                errors = {'errors': [
+                    {'index': index, **item_errors}
+                    for index, item_errors in enumerate(errors)
+                    if item_errors
+                ]}
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        titles = serializer.save()
+        return Response({'results': [
+            {'id': title.pk, 'created': 'id' not in item}
+            for title, item in zip(titles, serializer.validated_data)
+        ]}, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, url_path='stats')
+    def stats(self, request, id=None):
+        return self.get_conditional_response(
+            partial(self.get_cached_response, self.get_stats), request, id=id)
+
+    def get_stats(self, request, id=None):
+        distribution = ScoreDistribution.objects.select_related(
+            'title').filter(title_id=id).first()
+        if distribution is None:
+            distribution = ScoreDistribution(
+                title=get_object_or_404(Title, pk=id))
+        return Response(ScoreDistributionSerializer(distribution).data)
+
+
+class ReviewViewSet(ConditionalGetMixin, SparseFieldsQuerysetMixin,
+                    NestedParentMixin, CompiledListMixin,
+                    viewsets.ModelViewSet):
+    queryset = Review.objects.all()
     serializer_class = ReviewSerializer
     permission_classes = (IsUserOrStaff,)
-    pagination_class = PageNumberPagination
+    pagination_class = PubDatePagination
     http_method_names = ['get', 'post', 'patch', 'delete']
-
-    def get_queryset(self):
-        title = self.get_title()
-        new_queryset = title.reviews.all()
-        return new_queryset
+    cache_collections = ('titles', 'reviews', 'comments', 'users')
+    parent_model = Title
+    parent_lookups = {'pk': 'title_id'}
+    parent_filters = {'title_id': 'title_id'}
 
     def perform_create(self, serializer):
+        serializer.save(author=self.request.user, title=self.get_parent())
 
-        title = self.get_title()
-        serializer.save(author=self.request.user, title=title)
-
-    def get_title(self):
-        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
 
-
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, SparseFieldsQuerysetMixin,
+                     NestedParentMixin, CompiledListMixin,
+                     viewsets.ModelViewSet):
+    queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     permission_classes = (IsUserOrStaff,)
-    pagination_class = PageNumberPagination
+    pagination_class = PubDatePagination
     http_method_names = ['get', 'post', 'patch', 'delete']
-
-    def get_queryset(self):
-        review = self.get_review()
-        new_queryset = review.comments.all()
-        return new_queryset
+    cache_collections = ('reviews', 'comments', 'users')
+    parent_model = Review
+    parent_lookups = {'pk': 'review_id', 'title_id': 'title_id'}
+    parent_filters = {'review_id': 'review_id',
+                      'review__title_id': 'title_id'}
 
     def perform_create(self, serializer):
+        serializer.save(author=self.request.user, review=self.get_parent())
+
 
-        review = self.get_review()
-        serializer.save(author=self.request.user, review=review)
+class ExportApiView(generics.GenericAPIView):
+    """Выгрузка всей таблицы в NDJSON потоком.
+
+    Строки читаются iterator(chunk_size) по возрастанию id, так что
+    память не растёт с размером таблицы. `?since=` - id последней
+    полученной строки или, где есть since_field, дата и время.
+    """
+    permission_classes = (IsAdmin,)
+    chunk_size = EXPORT_CHUNK_SIZE
+    since_field = None
+
+    def get(self, request):
+        queryset = self.filter_since(self.get_queryset()).order_by('id')
+        return StreamingHttpResponse(
+            self.render_lines(self.get_serializer(), queryset),
+            content_type='application/x-ndjson; charset=utf-8',
+        )
 
-    def get_review(self):
-        return get_object_or_404(Review, pk=self.kwargs.get('review_id'),
-                                 title=self.kwargs.get('title_id'))
+    def filter_since(self, queryset):
+        since = self.request.query_params.get('since')
+        if not since:
+            return queryset
+        if since.isdigit():
+            return queryset.filter(pk__gt=int(since))
+        try:
+            moment = parse_datetime(since)
+        except ValueError:
+            moment = None
+        if moment is None or self.since_field is None:
+            raise ValidationError({'since': [
+                'Ожидается id или дата и время в ISO 8601.'
+                if self.since_field else 'Ожидается id.'
+            ]})
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return queryset.filter(**{f'{self.since_field}__gt': moment})
+
+    def get_chunks(self, serializer, queryset):
+        compiled = CompiledSerializer.compile(serializer)
+        if compiled is None:
+            objects = queryset.iterator(chunk_size=self.chunk_size)
+            while chunk := list(islice(objects, self.chunk_size)):
+                yield [serializer.to_representation(obj) for obj in chunk]
+            return
+        rows = queryset.values(*compiled.columns).iterator(
+            chunk_size=self.chunk_size)
+        while chunk := list(islice(rows, self.chunk_size)):
+            yield compiled.represent(chunk)
+
+    def render_lines(self, serializer, queryset):
+        renderer = FastJSONRenderer()
+        for chunk in self.get_chunks(serializer, queryset):
+            yield b''.join(
+                renderer.render(item) + b'\n' for item in chunk)
+
+
+class TitleExportApiView(ExportApiView):
+    queryset = Title.objects.all()
+    serializer_class = TitleSerializer
+
+
+class ReviewExportApiView(ExportApiView):
+    queryset = Review.objects.all()
+    serializer_class = ReviewExportSerializer
+    since_field = 'pub_date'
+
+
+class CommentExportApiView(ExportApiView):
+    queryset = Comment.objects.all()
+    serializer_class = CommentExportSerializer
+    since_field = 'pub_date'
@@ -25,6 +25,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.compression.CompressionMiddleware',
+    'api.cache.versions_snapshot_middleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -109,10 +111,51 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 5,
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
-    ]
+    ],
+    # orjson используется, если установлен; иначе - стандартный json.
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
 
+# Cache
+
+# Версии коллекций и счётчики кеша хранятся в БД (api/cache.py), поэтому
+# кеш ответов может быть своим у каждого воркера; общий кеш (например,
+# 'django.core.cache.backends.filebased.FileBasedCache') лишь поднимает
+# долю попаданий.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
 }
 
+API_CACHE_ALIAS = 'api'
+
+API_CACHE_TIMEOUT = 60 * 5
+
+# Как часто процесс записывает счётчики кеша в БД (api_cache_stats), с.
+API_CACHE_STATS_INTERVAL = 10
+
+# Наибольший id произведения для битового индекса фильтров
+# (api/bitmaps.py): множество занимает до API_BITMAP_MAX_ID / 8 байт.
+# Выше порога фильтры выполняются в SQL.
+API_BITMAP_MAX_ID = 2 ** 20
+
+# Ответы меньше порога не сжимаются: выигрыш меньше накладных расходов.
+API_COMPRESSION_MIN_SIZE = 512
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -131,3 +174,8 @@ EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 AUTH_USER_MODEL = 'reviews.User'
 
 DEFAULT_FROM_EMAIL = 'yamdb@example.ru'
+
+# Доставка писем из очереди (reviews/mail.py): 'thread' - фоновым потоком
+# процесса после коммита, 'worker' - только командой send_emails,
+# 'immediate' - сразу после коммита, в том же запросе.
+EMAIL_DELIVERY = 'thread'
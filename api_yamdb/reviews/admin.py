@@ -1,7 +1,8 @@
 from api.utils import LIMIT
 from django.contrib import admin
 
-from .models import Category, Comment, Genre, Review, Title, User
+from .models import (Category, Comment, Genre, OutgoingEmail, Review, Title,
+                     User)
 
 
 @admin.register(User)
@@ -27,7 +28,8 @@ class GenreAdmin(admin.ModelAdmin):
 
 @admin.register(Title)
 class TitleAdmin(admin.ModelAdmin):
-    list_display = ('id', 'name', 'year', 'category', 'display_genre')
+    list_display = ('id', 'name', 'year', 'category', 'display_genre',
+                    'rating', 'review_count')
     list_filter = ('year', 'category')
     list_editable = ('category',)
     list_display_links = ('id', 'name')
@@ -38,7 +40,8 @@ class TitleAdmin(admin.ModelAdmin):
 
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
-    list_display = ('id', 'author', 'title', 'score', 'pub_date')
+    list_display = ('id', 'author', 'title', 'score', 'pub_date',
+                    'comments_count')
 
 
 @admin.register(Comment)
@@ -57,3 +60,10 @@ class CommentAdmin(admin.ModelAdmin):
             return f"{obj.text[:LIMIT]}..."
         return obj.text
     display_text_preview.short_description = 'Текст'
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('id', 'to', 'subject', 'attempts', 'next_attempt_at',
+                    'last_error')
+    search_fields = ('to',)
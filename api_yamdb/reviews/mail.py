@@ -0,0 +1,170 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection as db_connection
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from api.utils import (EMAIL_BATCH_SIZE, EMAIL_LEASE, EMAIL_MAX_ATTEMPTS,
+                       EMAIL_RETRY_DELAY, EMAIL_RETRY_MAX_DELAY)
+from reviews.models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+
+def get_retry_delay(attempts):
+    """Пауза после attempts неудачных попыток: 30 с, 1 мин, 2 мин..."""
+    return timedelta(seconds=min(
+        EMAIL_RETRY_DELAY * 2 ** (attempts - 1), EMAIL_RETRY_MAX_DELAY))
+
+
+def queue_email(subject, body, to, from_email=None):
+    """Ставит письмо в очередь; отправка - после коммита транзакции."""
+    email = OutgoingEmail.objects.create(
+        subject=subject, body=body, to=to,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL)
+    if settings.EMAIL_DELIVERY == 'immediate':
+        transaction.on_commit(deliver_pending)
+    elif settings.EMAIL_DELIVERY == 'thread':
+        transaction.on_commit(background_sender.schedule)
+    return email
+
+
+def get_pending():
+    return OutgoingEmail.objects.filter(attempts__lt=EMAIL_MAX_ATTEMPTS)
+
+
+def claim_batch(batch_size):
+    """До batch_size писем, чья попытка наступила, с арендой на EMAIL_LEASE.
+
+    Аренда сдвигает next_attempt_at, поэтому другие отправители пакет
+    не видят; если процесс упадёт, письма вернутся в очередь сами.
+    """
+    now = timezone.now()
+    ids = list(get_pending().filter(
+        next_attempt_at__lte=now).values_list('id', flat=True)[:batch_size])
+    if not ids:
+        return []
+    lease = now + timedelta(seconds=EMAIL_LEASE)
+    OutgoingEmail.objects.filter(
+        pk__in=ids, next_attempt_at__lte=now).update(next_attempt_at=lease)
+    return list(OutgoingEmail.objects.filter(
+        pk__in=ids, next_attempt_at=lease))
+
+
+def send_batch(emails):
+    """Отправляет пакет через одно соединение с почтовым сервером."""
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as error:
+        return [], [(email, error) for email in emails]
+    sent, failed = [], []
+    try:
+        for email in emails:
+            message = EmailMessage(
+                email.subject, email.body, email.from_email, [email.to],
+                connection=connection)
+            try:
+                message.send()
+            except Exception as error:
+                failed.append((email, error))
+            else:
+                sent.append(email)
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def prune_given_up():
+    """Удаляет письма, исчерпавшие EMAIL_MAX_ATTEMPTS попыток."""
+    return OutgoingEmail.objects.filter(
+        attempts__gte=EMAIL_MAX_ATTEMPTS).delete()[0]
+
+
+def save_results(sent, failed):
+    # Отправленные и брошенные письма удаляются: в них код подтверждения.
+    removed = [email.pk for email in sent]
+    retried = []
+    now = timezone.now()
+    for email, error in failed:
+        email.attempts += 1
+        email.next_attempt_at = now + get_retry_delay(email.attempts)
+        email.last_error = f'{type(error).__name__}: {error}'
+        if email.attempts >= EMAIL_MAX_ATTEMPTS:
+            logger.error('Письмо %s для %s не отправлено за %s попыток '
+                         'и удалено: %s', email.pk, email.to,
+                         email.attempts, email.last_error)
+            removed.append(email.pk)
+            continue
+        logger.warning('Письмо %s не отправлено (попытка %s): %s',
+                       email.pk, email.attempts, email.last_error)
+        retried.append(email)
+    OutgoingEmail.objects.filter(pk__in=removed).delete()
+    OutgoingEmail.objects.bulk_update(
+        retried, ('attempts', 'next_attempt_at', 'last_error'))
+
+
+def deliver_pending(batch_size=EMAIL_BATCH_SIZE):
+    """Отправляет все письма, чья попытка наступила; (отправлено, ошибок)."""
+    total_sent = total_failed = 0
+    # Письма, брошенные до появления удаления в save_results.
+    prune_given_up()
+    while emails := claim_batch(batch_size):
+        sent, failed = send_batch(emails)
+        save_results(sent, failed)
+        total_sent += len(sent)
+        total_failed += len(failed)
+    return total_sent, total_failed
+
+
+def get_next_attempt_at():
+    return get_pending().aggregate(
+        next_attempt_at=Min('next_attempt_at'))['next_attempt_at']
+
+
+class BackgroundSender:
+    """Отправка очереди в одном фоновом потоке процесса.
+
+    Запуски выполняются по очереди, так что открыто не больше одного
+    соединения с почтовым сервером. После ошибок повтор планируется
+    таймером на время ближайшей попытки.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='email')
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def schedule(self):
+        return self._executor.submit(self._run)
+
+    def _run(self):
+        try:
+            deliver_pending()
+            retry_at = get_next_attempt_at()
+        except Exception:
+            logger.exception('Ошибка отправки очереди писем')
+            return
+        finally:
+            db_connection.close()
+        if retry_at is not None:
+            self._set_timer(
+                max((retry_at - timezone.now()).total_seconds(), 0))
+
+    def _set_timer(self, delay):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(delay, self.schedule)
+            self._timer.daemon = True
+            self._timer.start()
+
+
+background_sender = BackgroundSender()
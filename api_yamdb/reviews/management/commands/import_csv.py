@@ -1,8 +1,10 @@
 import os
 
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 import pandas as pd
 
+from api.cache import bump_versions
 from reviews.models import Category, Genre, Title, Review, Comment, User
 
 
@@ -35,6 +37,9 @@ class Command(BaseCommand):
                     print(f'Ошибка при импорте {filename}: {e}')
             else:
                 print(f'Файл {filename} не найден в директории')
+        # bulk_create не шлёт сигналы: сбрасываем кеши API вручную.
+        bump_versions('users', 'categories', 'genres', 'titles', 'reviews',
+                      'comments')
 
     def import_users(self, file_path):
         users = []
@@ -102,6 +107,7 @@ class Command(BaseCommand):
                 pub_date=row['pub_date']
             ))
         Review.objects.bulk_create(reviews)
+        call_command('recalc_ratings')
 
     def import_comments(self, file_path):
         df = pd.read_csv(file_path)
@@ -117,3 +123,4 @@ class Command(BaseCommand):
                 pub_date=row['pub_date']
             ))
         Comment.objects.bulk_create(comments)
+        call_command('recalc_comments')
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from api.cache import bump_versions
+from reviews.ratings import recalc_comments_counts
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает число комментариев всех отзывов'
+
+    def handle(self, *args, **kwargs):
+        updated = recalc_comments_counts()
+        bump_versions('reviews')
+        self.stdout.write(f'Пересчитано отзывов: {updated}')
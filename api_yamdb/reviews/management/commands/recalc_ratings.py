@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from api.cache import bump_versions
+from reviews.ratings import recalc_title_ratings
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рейтинг и число отзывов всех произведений'
+
+    def handle(self, *args, **kwargs):
+        updated = recalc_title_ratings()
+        bump_versions('titles', 'reviews')
+        self.stdout.write(f'Пересчитано произведений: {updated}')
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.utils import EMAIL_BATCH_SIZE
+from reviews.mail import deliver_pending
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int,
+                            default=EMAIL_BATCH_SIZE,
+                            help='Писем на одно соединение с сервером')
+        parser.add_argument('--loop', type=float, default=0,
+                            help='Пауза между проходами в секундах; '
+                                 'без неё - один проход')
+
+    def handle(self, *args, **kwargs):
+        while True:
+            sent, failed = deliver_pending(kwargs['batch_size'])
+            if sent or failed or not kwargs['loop']:
+                self.stdout.write(f'Отправлено: {sent}, ошибок: {failed}')
+            if not kwargs['loop']:
+                return
+            time.sleep(kwargs['loop'])
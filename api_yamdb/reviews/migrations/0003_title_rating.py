@@ -0,0 +1,52 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:11
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_ratings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    Title.objects.update(
+        review_count=Coalesce(
+            Subquery(reviews.annotate(c=Count('pk')).values('c')),
+            0, output_field=IntegerField()),
+        score_sum=Coalesce(
+            Subquery(reviews.annotate(s=Sum('score')).values('s')),
+            0, output_field=IntegerField()),
+        rating=Subquery(reviews.annotate(a=Avg('score')).values('a')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_alter_comment_review_alter_review_title'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество отзывов'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-rating', 'id'], name='title_rating_idx'),
+        ),
+        migrations.RunPython(fill_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:25
+
+from django.db import migrations
+
+from reviews.search import (create_title_search_index,
+                            drop_title_search_index)
+
+
+def create_index(apps, schema_editor):
+    create_title_search_index(schema_editor.connection)
+
+
+def drop_index(apps, schema_editor):
+    drop_title_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_review_comment_pub_date_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
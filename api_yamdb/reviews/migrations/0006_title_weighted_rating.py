@@ -0,0 +1,48 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:32
+
+from django.db import migrations, models
+from django.db.models import Case, F, FloatField, Sum, Value, When
+from django.db.models.functions import Cast
+
+from api.utils import MAX_SCORE, MIN_SCORE, RATING_MIN_REVIEWS
+
+
+def fill_weighted_ratings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    totals = Title.objects.aggregate(
+        scores=Sum('score_sum'), reviews=Sum('review_count'))
+    prior_mean = (totals['scores'] / totals['reviews'] if totals['reviews']
+                  else (MIN_SCORE + MAX_SCORE) / 2)
+    Title.objects.update(weighted_rating=Case(
+        When(review_count=0, then=Value(None)),
+        default=(
+            (Cast(F('score_sum'), FloatField())
+             + RATING_MIN_REVIEWS * prior_mean)
+            / (F('review_count') + RATING_MIN_REVIEWS)
+        ),
+        output_field=FloatField(),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_title_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='weighted_rating',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Взвешенный рейтинг'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-weighted_rating', 'id'], name='title_weighted_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', '-weighted_rating'], name='title_cat_weighted_rating_idx'),
+        ),
+        migrations.RunPython(fill_weighted_ratings, migrations.RunPython.noop),
+    ]
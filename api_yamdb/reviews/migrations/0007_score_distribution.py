@@ -0,0 +1,50 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_distributions(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    ScoreDistribution = apps.get_model('reviews', 'ScoreDistribution')
+    counts = {}
+    for title_id, score, count in Review.objects.order_by().values_list(
+        'title', 'score'
+    ).annotate(count=Count('pk')):
+        counts.setdefault(title_id, {})[f'score_{score}'] = count
+    ScoreDistribution.objects.bulk_create(
+        ScoreDistribution(title_id=title_id, **fields)
+        for title_id, fields in counts.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_weighted_rating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreDistribution',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='score_distribution', serialize=False, to='reviews.title', verbose_name='Произведение')),
+                ('score_1', models.PositiveIntegerField(default=0, verbose_name='Оценок 1')),
+                ('score_2', models.PositiveIntegerField(default=0, verbose_name='Оценок 2')),
+                ('score_3', models.PositiveIntegerField(default=0, verbose_name='Оценок 3')),
+                ('score_4', models.PositiveIntegerField(default=0, verbose_name='Оценок 4')),
+                ('score_5', models.PositiveIntegerField(default=0, verbose_name='Оценок 5')),
+                ('score_6', models.PositiveIntegerField(default=0, verbose_name='Оценок 6')),
+                ('score_7', models.PositiveIntegerField(default=0, verbose_name='Оценок 7')),
+                ('score_8', models.PositiveIntegerField(default=0, verbose_name='Оценок 8')),
+                ('score_9', models.PositiveIntegerField(default=0, verbose_name='Оценок 9')),
+                ('score_10', models.PositiveIntegerField(default=0, verbose_name='Оценок 10')),
+            ],
+            options={
+                'verbose_name': 'Распределение оценок',
+                'verbose_name_plural': 'Распределения оценок',
+            },
+        ),
+        migrations.RunPython(fill_distributions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.1 on 2026-10-18 21:43
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_comments_counts(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Comment = apps.get_model('reviews', 'Comment')
+    comments = Comment.objects.filter(
+        review=OuterRef('pk')
+    ).order_by().values('review')
+    Review.objects.update(comments_count=Coalesce(
+        Subquery(comments.annotate(c=Count('pk')).values('c')),
+        0, output_field=IntegerField()))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество комментариев'),
+        ),
+        migrations.RunPython(fill_comments_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.1 on 2026-10-18 21:58
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_review_comments_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CollectionVersion',
+            fields=[
+                ('name', models.CharField(max_length=150, primary_key=True, serialize=False, verbose_name='Коллекция')),
+                ('version', models.BigIntegerField(verbose_name='Версия')),
+                ('modified_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Изменена')),
+            ],
+            options={
+                'verbose_name': 'Версия коллекции',
+                'verbose_name_plural': 'Версии коллекций',
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.1 on 2026-10-18 22:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_collection_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheCounter',
+            fields=[
+                ('name', models.CharField(max_length=150, primary_key=True, serialize=False, verbose_name='Счётчик')),
+                ('value', models.BigIntegerField(default=0, verbose_name='Значение')),
+            ],
+            options={
+                'verbose_name': 'Счётчик кеша',
+                'verbose_name_plural': 'Счётчики кеша',
+            },
+        ),
+    ]
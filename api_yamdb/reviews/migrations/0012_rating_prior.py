@@ -0,0 +1,34 @@
+# Generated by Django 5.1.1 on 2026-10-18 22:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_cache_counter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RatingPrior',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mean', models.FloatField(verbose_name='Средняя оценка')),
+                ('score_sum', models.BigIntegerField(default=0, verbose_name='Сумма оценок')),
+                ('review_count', models.BigIntegerField(default=0, verbose_name='Количество отзывов')),
+            ],
+            options={
+                'verbose_name': 'Средняя оценка',
+                'verbose_name_plural': 'Средние оценки',
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='title',
+            name='title_cat_weighted_rating_idx',
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', '-weighted_rating', 'id'], name='title_cat_weighted_rating_idx'),
+        ),
+    ]
@@ -102,12 +102,41 @@ class Title(models.Model):
         on_delete=models.SET_NULL,
         null=True,
     )
+    rating = models.FloatField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Рейтинг',
+    )
+    review_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество отзывов',
+    )
+    score_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Сумма оценок',
+    )
+    weighted_rating = models.FloatField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Взвешенный рейтинг',
+    )
 
     class Meta:
         default_related_name = 'titles'
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ['-year']
+        indexes = (
+            models.Index(fields=('-rating', 'id'), name='title_rating_idx'),
+            models.Index(fields=('-weighted_rating', 'id'),
+                         name='title_weighted_rating_idx'),
+            models.Index(fields=('category', '-weighted_rating', 'id'),
+                         name='title_cat_weighted_rating_idx'),
+        )
 
     def __str__(self):
         return self.name
@@ -153,6 +182,11 @@ class Review(CommentReviewAbstractModel):
         on_delete=models.CASCADE,
         blank=True
     )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев',
+    )
 
     class Meta(CommentReviewAbstractModel.Meta):
         default_related_name = 'reviews'
@@ -163,6 +197,10 @@ class Review(CommentReviewAbstractModel):
                 fields=('author', 'title'),
                 name='unique_follow'
             ),)
+        indexes = (
+            models.Index(fields=('title', 'pub_date', 'id'),
+                         name='review_title_pub_date_idx'),
+        )
 
     def __str__(self):
         return (f'Отзыв {self.author.username}'
@@ -180,7 +218,164 @@ class Comment(CommentReviewAbstractModel):
         default_related_name = 'comments'
         verbose_name = 'коммент'
         verbose_name_plural = 'комменты'
+        indexes = (
+            models.Index(fields=('review', 'pub_date', 'id'),
+                         name='comment_review_pub_date_idx'),
+        )
 
     def __str__(self):
         return (f'Коммент {self.author.username}'
                 f' к обзору "{self.review.text[:LIMIT]}" ')
+
+
+class ScoreDistribution(models.Model):
+    title = models.OneToOneField(
+        Title,
+        verbose_name='Произведение',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='score_distribution',
+    )
+    score_1 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 1')
+    score_2 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 2')
+    score_3 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 3')
+    score_4 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 4')
+    score_5 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 5')
+    score_6 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 6')
+    score_7 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 7')
+    score_8 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 8')
+    score_9 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 9')
+    score_10 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 10')
+
+    class Meta:
+        verbose_name = 'Распределение оценок'
+        verbose_name_plural = 'Распределения оценок'
+
+    def __str__(self):
+        return f'Оценки {self.title_id}'
+
+    @staticmethod
+    def field_name(score):
+        return f'score_{score}'
+
+    def as_dict(self):
+        return {
+            score: getattr(self, self.field_name(score))
+            for score in range(MIN_SCORE, MAX_SCORE + 1)
+        }
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди отправки (см. reviews/mail.py)."""
+    subject = models.CharField(
+        max_length=MAX_LENGTH_255,
+        verbose_name='Тема')
+    body = models.TextField(verbose_name='Текст')
+    from_email = models.EmailField(
+        max_length=EMAIL_MAX_LENGTH,
+        verbose_name='Отправитель')
+    to = models.EmailField(
+        max_length=EMAIL_MAX_LENGTH,
+        verbose_name='Получатель')
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Создано')
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Следующая попытка')
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток')
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Последняя ошибка')
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+        indexes = (
+            models.Index(fields=('next_attempt_at',),
+                         name='email_next_attempt_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.subject} -> {self.to}'
+
+
+class CollectionVersion(models.Model):
+    """Версия коллекции API, общая для всех процессов (см. api/cache.py)."""
+    name = models.CharField(
+        max_length=NAME_MAX_LENGTH,
+        primary_key=True,
+        verbose_name='Коллекция')
+    version = models.BigIntegerField(verbose_name='Версия')
+    modified_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Изменена')
+
+    class Meta:
+        verbose_name = 'Версия коллекции'
+        verbose_name_plural = 'Версии коллекций'
+
+    def __str__(self):
+        return f'{self.name}: {self.version}'
+
+
+class CacheCounter(models.Model):
+    """Счётчик кеша ответов API, общий для всех процессов (api/cache.py)."""
+    name = models.CharField(
+        max_length=NAME_MAX_LENGTH,
+        primary_key=True,
+        verbose_name='Счётчик')
+    value = models.BigIntegerField(default=0, verbose_name='Значение')
+
+    class Meta:
+        verbose_name = 'Счётчик кеша'
+        verbose_name_plural = 'Счётчики кеша'
+
+    def __str__(self):
+        return f'{self.name}: {self.value}'
+
+
+class RatingPrior(models.Model):
+    """Средняя оценка C взвешенного рейтинга, общая для всех процессов.
+
+    mean - C, с которым посчитан weighted_rating всех произведений;
+    score_sum и review_count - общие счётчики оценок, по которым видно,
+    как далеко C ушла от настоящей средней (см. reviews/ratings.py).
+    """
+    mean = models.FloatField(verbose_name='Средняя оценка')
+    score_sum = models.BigIntegerField(
+        default=0,
+        verbose_name='Сумма оценок')
+    review_count = models.BigIntegerField(
+        default=0,
+        verbose_name='Количество отзывов')
+
+    class Meta:
+        verbose_name = 'Средняя оценка'
+        verbose_name_plural = 'Средние оценки'
+
+    def __str__(self):
+        return f'{self.mean:.2f}'
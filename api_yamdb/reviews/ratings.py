@@ -0,0 +1,176 @@
+from django.db import IntegrityError, transaction
+from django.db.models import (Avg, Case, Count, F, FloatField, IntegerField,
+                              OuterRef, Subquery, Sum, Value, When)
+from django.db.models.functions import Cast, Coalesce
+
+from api.utils import (MAX_SCORE, MIN_SCORE, RATING_MIN_REVIEWS,
+                       RATING_PRIOR_TOLERANCE)
+from reviews.models import (Comment, RatingPrior, Review, ScoreDistribution,
+                            Title)
+
+PRIOR_ID = 1
+
+
+def compute_totals():
+    totals = Title.objects.aggregate(
+        scores=Sum('score_sum'), reviews=Sum('review_count'))
+    return totals['scores'] or 0, totals['reviews'] or 0
+
+
+def get_mean(score_sum, review_count):
+    if not review_count:
+        return (MIN_SCORE + MAX_SCORE) / 2
+    return score_sum / review_count
+
+
+def get_rating_prior():
+    """Строка с C (средняя оценка в формуле IMDb) и общими счётчиками.
+
+    Хранится в БД, поэтому все процессы считают weighted_rating с одним
+    C; при первом обращении создаётся по счётчикам произведений.
+    """
+    prior = RatingPrior.objects.filter(pk=PRIOR_ID).first()
+    if prior is None:
+        score_sum, review_count = compute_totals()
+        prior, _ = RatingPrior.objects.get_or_create(pk=PRIOR_ID, defaults={
+            'mean': get_mean(score_sum, review_count),
+            'score_sum': score_sum,
+            'review_count': review_count,
+        })
+    return prior
+
+
+def weighted_rating(score_sum, review_count, prior_mean):
+    """(v·R + m·C) / (v + m), где v·R - сумма оценок произведения."""
+    return (
+        (Cast(score_sum, FloatField()) + RATING_MIN_REVIEWS * prior_mean)
+        / (review_count + RATING_MIN_REVIEWS)
+    )
+
+
+def apply_prior_mean(mean):
+    """Сохраняет новое C и пересчитывает им weighted_rating всех
+    произведений, чтобы рейтинги в топе оставались сравнимыми."""
+    RatingPrior.objects.filter(pk=PRIOR_ID).update(mean=mean)
+    return Title.objects.update(weighted_rating=Case(
+        When(review_count=0, then=Value(None)),
+        default=weighted_rating(F('score_sum'), F('review_count'), mean),
+        output_field=FloatField(),
+    ))
+
+
+def update_title_rating(title_id, count_delta, score_delta):
+    """Атомарно сдвигает счётчики произведения и пересчитывает рейтинги.
+
+    Все выражения в UPDATE вычисляются по старым значениям строки,
+    поэтому новые рейтинги считаются в том же запросе без гонок. C
+    берётся из RatingPrior в том же UPDATE; когда настоящая средняя
+    уходит от C дальше RATING_PRIOR_TOLERANCE, C обновляется для всех
+    произведений сразу.
+    """
+    new_count = F('review_count') + count_delta
+    new_sum = F('score_sum') + score_delta
+    no_reviews = When(review_count__lte=-count_delta, then=Value(None))
+    prior_mean = Subquery(
+        RatingPrior.objects.filter(pk=PRIOR_ID).values('mean'),
+        output_field=FloatField())
+    with transaction.atomic():
+        prior = get_rating_prior()
+        RatingPrior.objects.filter(pk=PRIOR_ID).update(
+            score_sum=F('score_sum') + score_delta,
+            review_count=F('review_count') + count_delta)
+        Title.objects.filter(pk=title_id).update(
+            review_count=new_count,
+            score_sum=new_sum,
+            rating=Case(
+                no_reviews,
+                default=Cast(new_sum, FloatField()) / new_count,
+                output_field=FloatField(),
+            ),
+            weighted_rating=Case(
+                no_reviews,
+                default=weighted_rating(new_sum, new_count, prior_mean),
+                output_field=FloatField(),
+            ),
+        )
+        mean = get_mean(prior.score_sum + score_delta,
+                        prior.review_count + count_delta)
+        if abs(mean - prior.mean) >= RATING_PRIOR_TOLERANCE:
+            apply_prior_mean(mean)
+
+
+def shift_score_bucket(title_id, score, delta):
+    """Атомарно сдвигает счётчик оценки `score` в гистограмме произведения.
+
+    Строка гистограммы создаётся при первом отзыве; параллельное
+    создание ловится по первичному ключу и сводится к UPDATE.
+    """
+    field = ScoreDistribution.field_name(score)
+    shift = {field: F(field) + delta}
+    if ScoreDistribution.objects.filter(title_id=title_id).update(**shift):
+        return
+    if delta < 0 or not Title.objects.filter(pk=title_id).exists():
+        return
+    try:
+        with transaction.atomic():
+            ScoreDistribution.objects.create(
+                title_id=title_id, **{field: delta})
+    except IntegrityError:
+        ScoreDistribution.objects.filter(title_id=title_id).update(**shift)
+
+
+def recalc_score_distributions():
+    counts = {}
+    for title_id, score, count in Review.objects.order_by().values_list(
+        'title', 'score'
+    ).annotate(count=Count('pk')):
+        counts.setdefault(title_id, {})[
+            ScoreDistribution.field_name(score)] = count
+    ScoreDistribution.objects.all().delete()
+    ScoreDistribution.objects.bulk_create(
+        ScoreDistribution(title_id=title_id, **fields)
+        for title_id, fields in counts.items()
+    )
+
+
+def recalc_title_ratings():
+    """Пересчитывает счётчики и рейтинги всех произведений с нуля."""
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    with transaction.atomic():
+        updated = Title.objects.update(
+            review_count=Coalesce(
+                Subquery(reviews.annotate(c=Count('pk')).values('c')),
+                0, output_field=IntegerField()),
+            score_sum=Coalesce(
+                Subquery(reviews.annotate(s=Sum('score')).values('s')),
+                0, output_field=IntegerField()),
+            rating=Subquery(reviews.annotate(a=Avg('score')).values('a')),
+        )
+        score_sum, review_count = compute_totals()
+        mean = get_mean(score_sum, review_count)
+        RatingPrior.objects.update_or_create(pk=PRIOR_ID, defaults={
+            'mean': mean,
+            'score_sum': score_sum,
+            'review_count': review_count,
+        })
+        apply_prior_mean(mean)
+        recalc_score_distributions()
+    return updated
+
+
+def update_comments_count(review_id, delta):
+    """Атомарно сдвигает счётчик комментариев отзыва."""
+    Review.objects.filter(pk=review_id).update(
+        comments_count=F('comments_count') + delta)
+
+
+def recalc_comments_counts():
+    """Пересчитывает счётчики комментариев всех отзывов с нуля."""
+    comments = Comment.objects.filter(
+        review=OuterRef('pk')
+    ).order_by().values('review')
+    return Review.objects.update(comments_count=Coalesce(
+        Subquery(comments.annotate(c=Count('pk')).values('c')),
+        0, output_field=IntegerField()))
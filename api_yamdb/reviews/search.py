@@ -0,0 +1,108 @@
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.utils import OperationalError
+
+TITLE_TABLE = 'reviews_title'
+TITLE_FTS_TABLE = 'reviews_title_fts'
+# Совпадение в названии весит больше, чем в описании.
+TITLE_FTS_RANK = f'bm25({TITLE_FTS_TABLE}, 10.0, 1.0)'
+
+CREATE_TITLE_FTS = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TITLE_FTS_TABLE} USING fts5("
+    f"name, description, content='{TITLE_TABLE}', content_rowid='id', "
+    f"tokenize='unicode61 remove_diacritics 2')"
+)
+TITLE_FTS_TRIGGERS = {
+    f'{TITLE_FTS_TABLE}_ai': (
+        f'AFTER INSERT ON {TITLE_TABLE} BEGIN '
+        f'INSERT INTO {TITLE_FTS_TABLE}(rowid, name, description) '
+        f'VALUES (new.id, new.name, new.description); END'
+    ),
+    f'{TITLE_FTS_TABLE}_ad': (
+        f'AFTER DELETE ON {TITLE_TABLE} BEGIN '
+        f'INSERT INTO {TITLE_FTS_TABLE}'
+        f'({TITLE_FTS_TABLE}, rowid, name, description) '
+        f"VALUES ('delete', old.id, old.name, old.description); END"
+    ),
+    # Только name и description: пересчёт рейтинга не трогает индекс.
+    f'{TITLE_FTS_TABLE}_au': (
+        f'AFTER UPDATE OF name, description ON {TITLE_TABLE} BEGIN '
+        f'INSERT INTO {TITLE_FTS_TABLE}'
+        f'({TITLE_FTS_TABLE}, rowid, name, description) '
+        f"VALUES ('delete', old.id, old.name, old.description); "
+        f'INSERT INTO {TITLE_FTS_TABLE}(rowid, name, description) '
+        f'VALUES (new.id, new.name, new.description); END'
+    ),
+}
+
+_available = set()
+
+
+def create_title_search_index(connection):
+    """Создаёт FTS5-индекс произведений и триггеры синхронизации.
+
+    Идемпотентна: SQLite при пересоздании reviews_title в миграциях
+    теряет триггеры, поэтому после migrate индекс восстанавливается
+    и перестраивается заново.
+    """
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(CREATE_TITLE_FTS)
+        except OperationalError:
+            # SQLite собран без FTS5: поиск работает через icontains.
+            return False
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+            'AND tbl_name = %s', [TITLE_TABLE]
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = set(TITLE_FTS_TRIGGERS) - existing
+        for name in missing:
+            cursor.execute(
+                f'CREATE TRIGGER {name} {TITLE_FTS_TRIGGERS[name]}')
+        if missing:
+            cursor.execute(
+                f"INSERT INTO {TITLE_FTS_TABLE}({TITLE_FTS_TABLE}) "
+                "VALUES ('rebuild')"
+            )
+    return True
+
+
+def drop_title_search_index(connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name in TITLE_FTS_TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        cursor.execute(f'DROP TABLE IF EXISTS {TITLE_FTS_TABLE}')
+
+
+def title_search_available(using=DEFAULT_DB_ALIAS):
+    if using in _available:
+        return True
+    connection = connections[using]
+    if (connection.vendor == 'sqlite' and TITLE_FTS_TABLE
+            in connection.introspection.table_names(include_views=False)):
+        _available.add(using)
+        return True
+    return False
+
+
+def search_words(value):
+    return re.findall(r'\w+', value)
+
+
+def build_match_query(words):
+    """Запрос FTS5 с поиском по префиксу каждого слова.
+
+    Слова берутся в кавычки, чтобы операторы FTS5 из ввода
+    не интерпретировались, и все они должны найтись (AND).
+    """
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def setup_title_search_index(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    create_title_search_index(connections[using])
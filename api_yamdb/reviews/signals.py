@@ -0,0 +1,63 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from reviews.models import Comment, Review
+from reviews.ratings import (shift_score_bucket, update_comments_count,
+                             update_title_rating)
+
+
+@receiver(post_init, sender=Review)
+def remember_review_score(sender, instance, **kwargs):
+    # Через __dict__, чтобы не подгружать отложенные поля при only().
+    instance._initial_score = instance.__dict__.get('score')
+    instance._initial_title_id = instance.__dict__.get('title_id')
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, **kwargs):
+    old_score = instance._initial_score
+    old_title_id = instance._initial_title_id
+    if created:
+        update_title_rating(instance.title_id, 1, instance.score)
+        shift_score_bucket(instance.title_id, instance.score, 1)
+    elif old_score is None or old_title_id is None:
+        # Оценка не была загружена, сдвиг неизвестен: поможет recalc_ratings.
+        pass
+    elif old_title_id != instance.title_id:
+        update_title_rating(old_title_id, -1, -old_score)
+        update_title_rating(instance.title_id, 1, instance.score)
+        shift_score_bucket(old_title_id, old_score, -1)
+        shift_score_bucket(instance.title_id, instance.score, 1)
+    elif old_score != instance.score:
+        update_title_rating(instance.title_id, 0, instance.score - old_score)
+        shift_score_bucket(instance.title_id, old_score, -1)
+        shift_score_bucket(instance.title_id, instance.score, 1)
+    instance._initial_score = instance.score
+    instance._initial_title_id = instance.title_id
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    update_title_rating(instance.title_id, -1, -instance.score)
+    shift_score_bucket(instance.title_id, instance.score, -1)
+
+
+@receiver(post_init, sender=Comment)
+def remember_comment_review(sender, instance, **kwargs):
+    instance._initial_review_id = instance.__dict__.get('review_id')
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    old_review_id = instance._initial_review_id
+    if created:
+        update_comments_count(instance.review_id, 1)
+    elif old_review_id is not None and old_review_id != instance.review_id:
+        update_comments_count(old_review_id, -1)
+        update_comments_count(instance.review_id, 1)
+    instance._initial_review_id = instance.review_id
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    update_comments_count(instance.review_id, -1)
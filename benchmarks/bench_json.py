@@ -0,0 +1,102 @@
+"""Бенчмарк: JSONRenderer/JSONParser против FastJSONRenderer/Parser.
+
+Запуск из корня репозитория:
+
+    python benchmarks/bench_json.py [--repeat 20]
+
+Нагрузки повторяют ответы API: страница произведений с жанрами и
+категорией, страница отзывов с pub_date и пакет для /titles/bulk/.
+"""
+import argparse
+import io
+import os
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from api.parsers import FastJSONParser  # noqa: E402
+from api.renderers import FastJSONRenderer, orjson  # noqa: E402
+
+
+def title_page(size):
+    return {
+        'count': 10000,
+        'next': 'http://testserver/api/v1/titles/?page=2',
+        'previous': None,
+        'results': [{
+            'id': i,
+            'name': f'Произведение {i}',
+            'year': 1900 + i % 120,
+            'rating': i % 10,
+            'description': 'Описание произведения ' * 10,
+            'genre': [{'name': 'Драма', 'slug': 'drama'},
+                      {'name': 'Комедия', 'slug': 'comedy'}],
+            'category': {'name': 'Фильм', 'slug': 'films'},
+        } for i in range(size)],
+    }
+
+
+def review_page(size):
+    return {
+        'count': 10000,
+        'next': None,
+        'previous': None,
+        'results': [{
+            'id': i,
+            'text': 'Текст отзыва ' * 20,
+            'score': i % 10 + 1,
+            'author': f'user{i}',
+            'pub_date': f'2024-01-02T03:{i % 60:02d}:05.123456Z',
+        } for i in range(size)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    print(f'orjson: {orjson.__version__ if orjson else "не установлен"}')
+
+    payloads = {
+        'titles x100': title_page(100),
+        'titles x10000': title_page(10000),
+        'reviews x100': review_page(100),
+        'reviews x10000': review_page(10000),
+    }
+    for name, payload in payloads.items():
+        timings = {}
+        for renderer in (JSONRenderer(), FastJSONRenderer()):
+            assert renderer.render(payload) == JSONRenderer().render(payload)
+            timings[type(renderer).__name__] = min(timeit.repeat(
+                lambda: renderer.render(payload),
+                number=1, repeat=args.repeat))
+        print_row(f'render {name}', timings)
+
+    body = JSONRenderer().render(title_page(1000)['results'])
+    timings = {
+        type(parser).__name__: min(timeit.repeat(
+            lambda: parser.parse(io.BytesIO(body)),
+            number=1, repeat=args.repeat))
+        for parser in (JSONParser(), FastJSONParser())
+    }
+    print_row('parse bulk x1000', timings)
+
+
+def print_row(name, timings):
+    (slow_name, slow), (fast_name, fast) = timings.items()
+    print(f'{name:<22} {slow_name} {slow * 1000:8.2f} мс, '
+          f'{fast_name} {fast * 1000:8.2f} мс, x{slow / fast:.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""Микробенчмарк: обычные сериализаторы против CompiledSerializer.
+
+Запуск из корня репозитория:
+
+    python benchmarks/bench_serializers.py [--rows 10000] [--repeat 5]
+
+База создаётся тестовой (SQLite в памяти), в неё пишется --rows
+произведений, отзывов и комментариев. Для каждого сериализатора
+печатается лучшее время из --repeat прогонов и проверяется, что JSON
+обоих вариантов совпадает побайтно.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import (setup_test_environment,  # noqa: E402
+                               teardown_test_environment)
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from api.cache import versions_snapshot  # noqa: E402
+from api.compiled import CompiledSerializer  # noqa: E402
+from api.serializers import (CommentSerializer, ReviewSerializer,  # noqa
+                             TitleSerializer)
+from reviews.models import (Category, Comment, Genre, Review,  # noqa: E402
+                            Title, User)
+
+
+def fill(rows):
+    categories = Category.objects.bulk_create(
+        Category(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(10))
+    genres = Genre.objects.bulk_create(
+        Genre(name=f'Жанр {i}', slug=f'genre-{i}') for i in range(20))
+    titles = Title.objects.bulk_create(
+        Title(name=f'Произведение {i}', year=1900 + i % 120,
+              description='Описание ' * 20, category=categories[i % 10],
+              rating=i % 10 + 0.5)
+        for i in range(rows))
+    Title.genre.through.objects.bulk_create(
+        Title.genre.through(title_id=title.pk, genre_id=genres[i % 20].pk)
+        for i, title in enumerate(titles))
+    # По одному отзыву автора на произведение из первой сотни.
+    users = User.objects.bulk_create(
+        User(username=f'user{i}', email=f'user{i}@example.com')
+        for i in range(rows // 100 + 1))
+    reviews = Review.objects.bulk_create(
+        Review(title=titles[i % 100], author=users[i // 100],
+               text='Отзыв ' * 30, score=i % 10 + 1)
+        for i in range(rows))
+    Comment.objects.bulk_create(
+        Comment(review=reviews[i], author=users[i % len(users)],
+                text='Комментарий ' * 10)
+        for i in range(rows))
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        fill(args.rows)
+        renderer = JSONRenderer()
+        # Как в запросе: версии справочников читаются один раз.
+        with versions_snapshot():
+            for serializer_class, queryset in (
+                (TitleSerializer, Title.objects.order_by('id')),
+                (ReviewSerializer,
+                 Review.objects.select_related('author').order_by('id')),
+                (CommentSerializer,
+                 Comment.objects.select_related('author').order_by('id')),
+            ):
+                compiled = CompiledSerializer.compile(
+                    serializer_class(many=True).child)
+                classic_time, classic = best_of(args.repeat, lambda: (
+                    renderer.render(
+                        serializer_class(queryset.all(), many=True).data)))
+                compiled_time, fast = best_of(args.repeat, lambda: (
+                    renderer.render(compiled.represent(
+                        queryset.values(*compiled.columns)))))
+                assert classic == fast, serializer_class.__name__
+                print(f'{serializer_class.__name__:<18} {args.rows} строк: '
+                      f'ModelSerializer {classic_time * 1000:8.1f} мс, '
+                      f'values() {compiled_time * 1000:8.1f} мс, '
+                      f'x{classic_time / compiled_time:.1f}')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,16 @@
+import pytest
+from django.core.cache import caches
+
+from api.bitmaps import title_index
+from api.cache import cache_counters
+from api.dictionaries import DICTIONARIES
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+    for dictionary in DICTIONARIES.values():
+        dictionary.invalidate()
+    title_index.invalidate()
+    cache_counters.clear()
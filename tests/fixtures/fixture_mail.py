@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def immediate_email_delivery(settings):
+    # Тесты проверяют mail.outbox сразу после ответа.
+    settings.EMAIL_DELIVERY = 'immediate'
@@ -0,0 +1,145 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Title
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_title(self, title_id):
+        return Title.objects.get(pk=title_id)
+
+    def test_01_rating_follows_reviews(self, admin_client, admin, user,
+                                       user_client, moderator,
+                                       moderator_client):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        title = self.get_title(titles[0]['id'])
+        assert (title.review_count, title.score_sum, title.rating) == (
+            3, 15, 5
+        ), (
+            'Проверьте, что при создании отзыва обновляются поля '
+            '`review_count`, `score_sum` и `rating` произведения.'
+        )
+
+        response = user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=reviews[1]['id']
+            ),
+            data={'score': 8}
+        )
+        assert response.status_code == HTTPStatus.OK
+        title = self.get_title(titles[0]['id'])
+        assert (title.review_count, title.score_sum, title.rating) == (
+            3, 18, 6
+        ), (
+            'Проверьте, что при изменении оценки пересчитывается рейтинг '
+            'произведения.'
+        )
+
+        response = admin_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=reviews[0]['id']
+            )
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        title = self.get_title(titles[0]['id'])
+        assert (title.review_count, title.score_sum, title.rating) == (
+            2, 13, 6.5
+        ), (
+            'Проверьте, что при удалении отзыва пересчитывается рейтинг '
+            'произведения.'
+        )
+
+        user.delete()
+        moderator.delete()
+        title = self.get_title(titles[0]['id'])
+        assert (title.review_count, title.score_sum, title.rating) == (
+            0, 0, None
+        ), (
+            'Проверьте, что каскадное удаление отзывов вместе с автором '
+            'обнуляет рейтинг произведения.'
+        )
+
+    def test_02_recalc_ratings_command(self, admin_client, admin, user,
+                                       user_client):
+        author_map = {admin: admin_client, user: user_client}
+        _, titles = create_reviews(admin_client, author_map)
+        Title.objects.update(review_count=0, score_sum=0, rating=None)
+
+        call_command('recalc_ratings')
+
+        title = self.get_title(titles[0]['id'])
+        assert (title.review_count, title.score_sum, title.rating) == (
+            2, 10, 5
+        ), (
+            'Проверьте, что команда `recalc_ratings` восстанавливает '
+            'счётчики отзывов и рейтинг.'
+        )
+        title = self.get_title(titles[1]['id'])
+        assert (title.review_count, title.score_sum, title.rating) == (
+            0, 0, None
+        )
+
+    def test_03_score_distribution(self, client, admin_client, admin, user,
+                                   user_client, moderator, moderator_client):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        url = f"/api/v1/titles/{titles[0]['id']}/stats/"
+        user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=reviews[1]['id']
+            ),
+            data={'score': 10}
+        )
+        moderator.delete()
+
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            'Эндпоинт `/api/v1/titles/{title_id}/stats/` не найден.'
+        )
+        data = response.json()
+        expected = {str(score): 0 for score in range(1, 11)}
+        expected.update({'5': 1, '10': 1})
+        assert data['score_distribution'] == expected, (
+            'Проверьте, что распределение оценок обновляется при создании, '
+            'изменении и удалении отзывов.'
+        )
+        assert (data['review_count'], data['rating']) == (2, 7.5)
+
+        empty = client.get(f"/api/v1/titles/{titles[1]['id']}/stats/").json()
+        assert set(empty['score_distribution'].values()) == {0}
+        for title_id in ('0', 'abc'):
+            assert client.get(
+                f'/api/v1/titles/{title_id}/stats/'
+            ).status_code == HTTPStatus.NOT_FOUND, (
+                'Проверьте, что статистика несуществующего произведения '
+                'возвращает 404.'
+            )
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        title.score_distribution.delete()
+        call_command('recalc_ratings')
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert title.score_distribution.as_dict() == {
+            int(score): count for score, count in expected.items()
+        }, (
+            'Проверьте, что команда `recalc_ratings` восстанавливает '
+            'распределение оценок.'
+        )
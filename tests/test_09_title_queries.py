@@ -0,0 +1,70 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.pagination import PageNumberPagination
+
+from api.dictionaries import categories, genres
+from reviews.models import Category, Genre, Title
+from tests.utils import data_queries
+
+# count + страница произведений + id жанров; сами категории и жанры
+# берутся из справочников процесса.
+TITLE_LIST_QUERIES = 3
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def create_titles(self, count):
+        category_objects = Category.objects.bulk_create(
+            Category(name=f'Категория {i}', slug=f'cat-{i}') for i in range(3)
+        )
+        genre_objects = Genre.objects.bulk_create(
+            Genre(name=f'Жанр {i}', slug=f'genre-{i}') for i in range(4)
+        )
+        titles = Title.objects.bulk_create(
+            Title(name=f'Произведение {i}', year=2000,
+                  category=category_objects[i % len(category_objects)])
+            for i in range(count)
+        )
+        through = Title.genre.through
+        through.objects.bulk_create(
+            through(title_id=title.id, genre_id=genre.id)
+            for idx, title in enumerate(titles)
+            for genre in genre_objects[:idx % len(genre_objects) + 1]
+        )
+        categories.all()
+        genres.all()
+
+    @pytest.mark.parametrize('page_size', (5, 50, 500))
+    def test_01_title_list_query_budget(self, client, monkeypatch, page_size):
+        self.create_titles(page_size)
+        monkeypatch.setattr(PageNumberPagination, 'page_size', page_size)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(self.TITLES_URL)
+
+        results = response.json()['results']
+        assert len(results) == page_size
+        assert all(title['category'] and title['genre'] for title in results)
+        assert len(data_queries(queries)) == TITLE_LIST_QUERIES, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` выполняет '
+            f'{TITLE_LIST_QUERIES} запроса к БД независимо от размера '
+            f'страницы. Для страницы из {page_size} элементов выполнено '
+            f'{len(data_queries(queries))}.'
+        )
+
+    def test_02_title_detail_query_budget(self, client):
+        self.create_titles(1)
+        title = Title.objects.get()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(f'{self.TITLES_URL}{title.id}/')
+
+        assert response.json()['genre']
+        assert len(data_queries(queries)) == 2, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}{{title_id}}/` '
+            'загружает категорию и жанры без дополнительных запросов.'
+        )
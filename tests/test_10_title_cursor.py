@@ -0,0 +1,101 @@
+from http import HTTPStatus
+
+import pytest
+from django.db.models import F
+
+from reviews.models import Category, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10TitleCursorPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def create_titles(self):
+        category = Category.objects.create(name='Фильм', slug='films')
+        ratings = (None, 7.5, 3, 7.5, None, 9, 1, 7.5, None, 2, 5, 7.5)
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {idx:02}', year=1950 + idx % 4,
+                  category=None if idx % 5 else category, rating=rating,
+                  review_count=int(rating is not None))
+            for idx, rating in enumerate(ratings)
+        )
+
+    def walk(self, client, url):
+        names, previous, last_page = [], None, []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что пагинация курсором не считает COUNT(*).'
+            )
+            last_page = [title['name'] for title in data['results']]
+            names.extend(last_page)
+            previous, url = data['previous'], data['next']
+        return names, previous, last_page
+
+    @pytest.mark.parametrize('ordering', (
+        '', 'rating', '-rating', 'name', '-year', 'category'
+    ))
+    def test_01_cursor_walk_matches_page_numbers(self, client, ordering):
+        self.create_titles()
+        query = f'ordering={ordering}&' if ordering else ''
+        expected = list(
+            Title.objects.order_by(
+                *self.expected_order(ordering)
+            ).values_list('name', flat=True)
+        )
+
+        names, previous, last_page = self.walk(client, f'{self.TITLES_URL}?{query}cursor=')
+        assert names == expected, (
+            'Проверьте, что обход `/api/v1/titles/` курсором возвращает все '
+            'произведения без пропусков и повторов в порядке сортировки.'
+        )
+
+        backward = []
+        url = previous
+        while url:
+            data = client.get(url).json()
+            backward[:0] = [title['name'] for title in data['results']]
+            url = data['previous']
+        assert backward == expected[:-len(last_page)], (
+            'Проверьте, что ссылки `previous` при пагинации курсором ведут '
+            'на предыдущие страницы.'
+        )
+
+    @staticmethod
+    def expected_order(ordering):
+        fields = {'rating': 'rating', 'name': 'name', 'year': 'year',
+                  'category': 'category__name'}
+        name = ordering.lstrip('-') or 'rating'
+        descending = ordering.startswith('-') or not ordering
+        expression = F(fields[name])
+        return (
+            expression.desc(nulls_last=True) if descending
+            else expression.asc(nulls_last=True),
+            'id'
+        )
+
+    def test_02_page_number_pagination_by_default(self, client):
+        self.create_titles()
+        data = client.get(self.TITLES_URL).json()
+        assert data['count'] == Title.objects.count(), (
+            'Проверьте, что без параметра `cursor` эндпоинт '
+            f'`{self.TITLES_URL}` по-прежнему использует постраничную '
+            'пагинацию.'
+        )
+
+    def test_03_new_titles_do_not_duplicate_items(self, client):
+        self.create_titles()
+        data = client.get(f'{self.TITLES_URL}?ordering=name&cursor=').json()
+        seen = [title['name'] for title in data['results']]
+        Title.objects.create(name='Произведение 00 новое', year=2000)
+        data = client.get(data['next']).json()
+        assert not set(seen) & {title['name'] for title in data['results']}
+
+    def test_04_invalid_cursor(self, client):
+        response = client.get(f'{self.TITLES_URL}?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        response = client.get(f'{self.TITLES_URL}?ordering=genre&cursor=')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
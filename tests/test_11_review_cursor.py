@@ -0,0 +1,87 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from reviews.models import Comment, Review, Title
+from tests.utils import data_queries
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ReviewCommentCursorPagination:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def create_data(self, django_user_model, count=12):
+        now = timezone.now()
+        # Несколько записей с одинаковой датой, чтобы проверить id в ключе.
+        dates = [now - timedelta(minutes=idx // 3) for idx in range(count)]
+        users = django_user_model.objects.bulk_create(
+            django_user_model(username=f'user{idx}',
+                              email=f'user{idx}@yamdb.fake')
+            for idx in range(count)
+        )
+        title = Title.objects.create(name='Произведение', year=2000)
+        reviews = Review.objects.bulk_create(
+            Review(title=title, author=user, text=f'review {idx}', score=5,
+                   pub_date=date)
+            for idx, (user, date) in enumerate(zip(users, dates))
+        )
+        Comment.objects.bulk_create(
+            Comment(review=reviews[0], author=user, text=f'comment {idx}',
+                    pub_date=date)
+            for idx, (user, date) in enumerate(zip(users, dates))
+        )
+        return title, reviews[0]
+
+    def walk(self, client, url):
+        ids, query_counts = [], []
+        # Первый запрос создаёт строки версий коллекций (api/cache.py).
+        client.get(url)
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            query_counts.append(len(data_queries(queries)))
+            ids.extend(item['id'] for item in data['results'])
+            url = data['next']
+        return ids, query_counts
+
+    def test_01_reviews_cursor(self, client, django_user_model):
+        title, _ = self.create_data(django_user_model)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        expected = list(title.reviews.order_by(
+            '-pub_date', '-id').values_list('id', flat=True))
+
+        ids, query_counts = self.walk(client, f'{url}?cursor=')
+        assert ids == expected, (
+            f'Проверьте, что обход `{self.REVIEWS_URL_TEMPLATE}` курсором '
+            'возвращает все отзывы по убыванию `pub_date` без повторов.'
+        )
+        assert len(set(query_counts[:-1])) == 1, (
+            'Проверьте, что стоимость страницы при пагинации курсором не '
+            'зависит от её глубины.'
+        )
+        assert 'count' in client.get(url).json()
+
+    def test_02_comments_cursor(self, client, django_user_model):
+        title, review = self.create_data(django_user_model)
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title.id, review_id=review.id)
+        expected = list(review.comments.order_by(
+            '-pub_date', '-id').values_list('id', flat=True))
+
+        ids, query_counts = self.walk(client, f'{url}?cursor=')
+        assert ids == expected, (
+            f'Проверьте, что обход `{self.COMMENTS_URL_TEMPLATE}` курсором '
+            'возвращает все комментарии по убыванию `pub_date` без повторов.'
+        )
+        assert len(set(query_counts[:-1])) == 1
+        assert 'count' in client.get(url).json()
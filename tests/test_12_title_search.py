@@ -0,0 +1,86 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Title
+from tests.utils import data_queries
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def create_titles(self):
+        return {
+            title.name: title for title in Title.objects.bulk_create((
+                Title(name='Терминатор', year=1984,
+                      description='Киборг из будущего'),
+                Title(name='Терминатор 2', year=1991,
+                      description='Судный день'),
+                Title(name='Чужой', year=1979,
+                      description='Терминатор тут ни при чём'),
+                Title(name='Крепкий орешек', year=1988,
+                      description='Yippie ki yay'),
+            ))
+        }
+
+    def search(self, client, query):
+        response = client.get(self.TITLES_URL, {'search': query})
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_prefix_search_is_ranked(self, client):
+        self.create_titles()
+        names = self.search(client, 'терм')
+        assert set(names) == {'Терминатор', 'Терминатор 2', 'Чужой'}, (
+            f'Проверьте, что параметр `search` эндпоинта `{self.TITLES_URL}` '
+            'ищет по префиксу в названии и описании без учёта регистра.'
+        )
+        assert names[-1] == 'Чужой', (
+            'Проверьте, что совпадения в названии ранжируются выше '
+            'совпадений в описании.'
+        )
+        assert self.search(client, 'терминатор 2') == ['Терминатор 2']
+        assert self.search(client, 'ki "yay') == ['Крепкий орешек']
+
+    def test_02_index_follows_title_writes(self, client):
+        titles = self.create_titles()
+        title = titles['Чужой']
+        title.name = 'Чужие'
+        title.description = 'Продолжение'
+        title.save()
+        titles['Терминатор 2'].delete()
+
+        assert self.search(client, 'терм') == ['Терминатор']
+        assert self.search(client, 'чужие') == ['Чужие']
+        assert self.search(client, 'Чужой') == []
+
+    def test_03_name_filter_still_works(self, client):
+        self.create_titles()
+        response = client.get(self.TITLES_URL, {'name': 'минато'})
+        assert response.json()['count'] == 2
+
+    def test_04_many_matches(self, client):
+        Title.objects.bulk_create(
+            Title(name=f'Star {number}', year=2000, description='Стар')
+            for number in range(3000)
+        )
+        started = time.monotonic()
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(
+                self.TITLES_URL, {'search': 'st', 'facets': 'year'})
+        elapsed = time.monotonic() - started
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 3000
+        assert all(sql.count('MATCH') <= 1 for sql in data_queries(queries)), (
+            'Проверьте, что поиск выполняет MATCH по индексу один раз '
+            'за запрос, а не для каждого найденного произведения.'
+        )
+        assert elapsed < 2, (
+            'Проверьте, что время поиска растёт не быстрее числа '
+            'найденных произведений.'
+        )
@@ -0,0 +1,98 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.signals import post_delete
+from django.test.utils import CaptureQueriesContext
+
+from api.cache import cache_counters, get_cache
+from reviews.models import (CacheCounter, Category, Genre, OutgoingEmail,
+                            Review, Title)
+from tests.utils import create_titles, data_queries
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13TitleCache:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def get(self, client, url, params=None):
+        response = client.get(url, params)
+        return response['X-Cache'], response.json()
+
+    def test_01_cache_hit_with_normalized_params(self, client, admin_client):
+        create_titles(admin_client)
+        state, first = self.get(
+            client, f'{self.TITLES_URL}?year=1984&genre=horror')
+        assert state == 'MISS'
+        state, second = self.get(
+            client, f'{self.TITLES_URL}?genre=horror&year=1984')
+        assert state == 'HIT', (
+            'Проверьте, что запросы с одинаковыми параметрами в разном '
+            'порядке попадают в одну запись кеша.'
+        )
+        assert first == second
+        state, _ = self.get(client, f'{self.TITLES_URL}?genre=comedy')
+        assert state == 'MISS'
+
+    @pytest.mark.parametrize('change', ('title', 'genre', 'category',
+                                        'review', 'title_genre'))
+    def test_02_writes_invalidate_cache(self, client, admin_client, admin,
+                                        change):
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(pk=titles[0]['id'])
+        url = f'{self.TITLES_URL}{title.id}/'
+        self.get(client, url)
+        assert self.get(client, url)[0] == 'HIT'
+
+        if change == 'title':
+            Title.objects.filter(pk=title.pk).get().save()
+        elif change == 'genre':
+            Genre.objects.create(name='Новый', slug='new')
+        elif change == 'category':
+            Category.objects.first().save()
+        elif change == 'review':
+            Review.objects.create(title=title, author=admin, text='t',
+                                  score=9)
+        else:
+            title.genre.clear()
+
+        state, data = self.get(client, url)
+        assert state == 'MISS', (
+            f'Проверьте, что изменение `{change}` сбрасывает кеш '
+            'произведений.'
+        )
+        if change == 'review':
+            assert data['rating'] == 9
+        if change == 'title_genre':
+            assert data['genre'] == []
+
+    def test_03_cache_stats(self, client, admin_client, capsys, settings):
+        create_titles(admin_client)
+        settings.API_CACHE_STATS_INTERVAL = 60
+        self.get(client, self.TITLES_URL)
+        assert not CacheCounter.objects.exists(), (
+            'Проверьте, что счётчики кеша не пишутся в БД на каждый запрос.'
+        )
+        settings.API_CACHE_STATS_INTERVAL = 0
+        self.get(client, self.TITLES_URL)
+        # У команды в своём процессе нет ни кеша, ни счётчиков запросов.
+        cache_counters.clear()
+        get_cache().clear()
+        call_command('api_cache_stats')
+        assert 'Попаданий: 1, промахов: 1' in capsys.readouterr().out, (
+            'Проверьте, что api_cache_stats видит счётчики других процессов.'
+        )
+
+    def test_04_fast_delete_kept(self, admin_client):
+        assert not post_delete.has_listeners(OutgoingEmail)
+        assert not post_delete.has_listeners(Title.genre.through), (
+            'Проверьте, что сброс кеша подписан только на модели '
+            'коллекций и не отключает удаление одним запросом.'
+        )
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(pk=titles[0]['id'])
+        with CaptureQueriesContext(connection) as queries:
+            title.genre.clear()
+        assert not any(
+            sql.startswith('SELECT') for sql in data_queries(queries)
+        ), 'Проверьте, что связи жанров удаляются без чтения строк.'
@@ -0,0 +1,68 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import (create_reviews, create_single_review,
+                         data_queries, version_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ConditionalGet:
+
+    URLS = (
+        '/api/v1/titles/',
+        '/api/v1/titles/{title_id}/',
+        '/api/v1/titles/{title_id}/reviews/',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+        '/api/v1/categories/',
+        '/api/v1/genres/',
+    )
+
+    def test_01_not_modified_without_queries(self, client, admin_client,
+                                             admin):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        for template in self.URLS:
+            url = template.format(
+                title_id=titles[0]['id'], review_id=reviews[0]['id'])
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            etag = response['ETag']
+            last_modified = response['Last-Modified']
+            assert etag.startswith('"'), (
+                f'Проверьте, что ответ на GET-запрос к `{template}` '
+                'содержит строгий ETag.'
+            )
+
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что GET-запрос к `{template}` с актуальным '
+                '`If-None-Match` возвращает ответ со статусом 304.'
+            )
+            assert not data_queries(queries), (
+                f'Проверьте, что ответ 304 на GET-запрос к `{template}` '
+                'отдаётся без запросов к БД, кроме чтения версий.'
+            )
+            assert len(version_queries(queries)) == 1
+            response = client.get(
+                url, HTTP_IF_MODIFIED_SINCE=last_modified)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_02_write_changes_etag(self, client, admin_client, admin, user,
+                                   user_client):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        url = f"/api/v1/titles/{titles[0]['id']}/reviews/"
+        etag = client.get(url)['ETag']
+
+        create_single_review(user_client, titles[0]['id'], 'text', 3)
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после нового отзыва ETag списка отзывов '
+            'меняется.'
+        )
+        assert response['ETag'] != etag
+        assert response.json()['count'] == 2
@@ -0,0 +1,84 @@
+import pytest
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+
+from api.cache import bump_versions, get_cache, get_versions
+from api.dictionaries import genres
+from reviews.models import CollectionVersion, Genre
+from tests.utils import (create_genre, create_titles, data_queries,
+                         version_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15Dictionaries:
+
+    GENRES_URL = '/api/v1/genres/'
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_genre_list_from_dictionary(self, client, admin_client):
+        expected = create_genre(admin_client)
+        client.get(self.GENRES_URL)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(f'{self.GENRES_URL}?page=1')
+        assert not data_queries(queries), (
+            f'Проверьте, что список `{self.GENRES_URL}` берётся из '
+            'справочника процесса без запросов к БД, кроме чтения версий.'
+        )
+        assert len(version_queries(queries)) == 1
+        assert response.json()['count'] == len(expected)
+        names = [genre['name'] for genre in response.json()['results']]
+        assert names == sorted(names)
+
+    def test_02_write_in_process_is_visible(self, client, admin_client):
+        create_genre(admin_client)
+        client.get(self.GENRES_URL)
+        admin_client.post(self.GENRES_URL, {'name': 'Аниме', 'slug': 'anime'})
+        response = client.get(self.GENRES_URL)
+        assert response.json()['count'] == 4
+
+        response = admin_client.post(
+            self.GENRES_URL, {'name': 'Аниме', 'slug': 'anime'})
+        assert response.status_code == 400
+
+    def test_03_version_bump_from_other_process(self, client, admin_client):
+        create_titles(admin_client)
+        genres.all()
+        # Другой процесс: запись без сигналов в этом процессе + новая версия.
+        Genre.objects.filter(slug='horror').update(name='Хоррор')
+        bump_versions('genres', 'titles')
+
+        data = client.get(self.TITLES_URL, {'genre': 'horror'}).json()
+        assert {'name': 'Хоррор', 'slug': 'horror'} in (
+            data['results'][0]['genre']
+        ), (
+            'Проверьте, что справочник жанров перечитывается после смены '
+            'версии коллекции.'
+        )
+
+    def test_04_versions_shared_between_processes(self):
+        version, = get_versions('genres')
+        # Кеш API у каждого процесса свой: версии в нём не хранятся.
+        get_cache().clear()
+        assert get_versions('genres') == [version]
+        # Другой процесс сдвигает версию в общей таблице.
+        CollectionVersion.objects.filter(name='genres').update(
+            version=F('version') + 1)
+        assert get_versions('genres') == [version + 1], (
+            'Проверьте, что версии коллекций общие для всех процессов.'
+        )
+
+    def test_05_slug_from_other_process(self, admin_client):
+        create_titles(admin_client)
+        genres.all()
+        # Жанр другого процесса, чья версия сюда ещё не дошла.
+        Genre.objects.bulk_create([Genre(name='Аниме', slug='anime')])
+        response = admin_client.post(self.TITLES_URL, data={
+            'name': 'Акира', 'year': 1988, 'category': 'films',
+            'genre': ['anime'],
+        })
+        assert response.status_code == 201, (
+            'Проверьте, что slug, которого нет в справочнике процесса, '
+            'ищется в БД.'
+        )
@@ -0,0 +1,127 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.utils import RATING_MIN_REVIEWS, RATING_PRIOR_TOLERANCE
+from reviews.models import Category, Genre, RatingPrior, Review, Title
+from tests.utils import data_queries
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16TopTitles:
+
+    TOP_URL = '/api/v1/titles/top/'
+
+    def create_data(self, django_user_model):
+        users = django_user_model.objects.bulk_create(
+            django_user_model(username=f'user{idx}',
+                              email=f'user{idx}@yamdb.fake')
+            for idx in range(10)
+        )
+        films = Category.objects.create(name='Фильм', slug='films')
+        books = Category.objects.create(name='Книги', slug='books')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        one_hit = Title.objects.create(name='Один отзыв', year=2000,
+                                       category=films)
+        classic = Title.objects.create(name='Классика', year=1950,
+                                       category=books)
+        classic.genre.add(drama)
+        Title.objects.create(name='Без отзывов', year=2001, category=films)
+        flop = Title.objects.create(name='Провал', year=2002, category=books)
+        Review.objects.create(title=one_hit, author=users[0], text='t',
+                              score=10)
+        for user in users:
+            Review.objects.create(title=classic, author=user, text='t',
+                                  score=9)
+            Review.objects.create(title=flop, author=user, text='t',
+                                  score=3)
+        return one_hit, classic, flop
+
+    def test_01_bayesian_ranking(self, client, django_user_model):
+        one_hit, classic, flop = self.create_data(django_user_model)
+        call_command('recalc_ratings')
+
+        response = client.get(self.TOP_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Эндпоинт `{self.TOP_URL}` не найден или недоступен.'
+        )
+        data = response.json()
+        assert [title['id'] for title in data] == [
+            classic.id, one_hit.id, flop.id
+        ], (
+            f'Проверьте, что `{self.TOP_URL}` ранжирует по взвешенному '
+            'рейтингу и не показывает произведения без отзывов.'
+        )
+        prior = (10 + 9 * 10 + 3 * 10) / 21
+        expected = (10 + RATING_MIN_REVIEWS * prior) / (1 + RATING_MIN_REVIEWS)
+        assert data[1]['weighted_rating'] == pytest.approx(expected)
+
+    def test_02_incremental_update_and_filters(self, client,
+                                               django_user_model):
+        one_hit, classic, flop = self.create_data(django_user_model)
+        classic.reviews.all().delete()
+
+        data = client.get(self.TOP_URL).json()
+        assert [title['id'] for title in data] == [one_hit.id, flop.id], (
+            'Проверьте, что взвешенный рейтинг обновляется при удалении '
+            'отзывов.'
+        )
+        Review.objects.create(title=classic, author=one_hit.reviews.get(
+        ).author, text='t', score=4)
+        assert [title['id'] for title in client.get(
+            self.TOP_URL, {'genre': 'drama'}).json()] == [classic.id]
+        assert [title['id'] for title in client.get(
+            self.TOP_URL, {'category': 'films'}).json()] == [one_hit.id]
+        assert flop.id not in [title['id'] for title in client.get(
+            self.TOP_URL, {'category': 'films'}).json()]
+        assert len(client.get(self.TOP_URL, {'limit': 1}).json()) == 1
+        assert client.get(
+            self.TOP_URL, {'limit': 'x'}).status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_top_is_an_index_read(self, client, django_user_model):
+        self.create_data(django_user_model)
+        client.get('/api/v1/genres/')
+        client.get('/api/v1/categories/')
+        with CaptureQueriesContext(connection) as queries:
+            client.get(self.TOP_URL, {'limit': 2})
+        sql = data_queries(queries)
+        assert len(sql) == 2
+        assert 'reviews_review' not in sql[0], (
+            f'Проверьте, что `{self.TOP_URL}` не агрегирует отзывы.'
+        )
+
+    def test_04_category_uses_index(self, client, django_user_model):
+        self.create_data(django_user_model)
+        client.get('/api/v1/categories/')
+        with CaptureQueriesContext(connection) as queries:
+            client.get(self.TOP_URL, {'category': 'films'})
+        sql, = [query for query in data_queries(queries)
+                if query.startswith('SELECT "reviews_title"')]
+        assert '"category_id" IN' in sql and 'json_each' not in sql, (
+            f'Проверьте, что `{self.TOP_URL}?category=` фильтрует по '
+            'category_id и читает индекс (category, -weighted_rating).'
+        )
+
+    def test_05_shared_prior(self, django_user_model):
+        one_hit, classic, flop = self.create_data(django_user_model)
+        for user in django_user_model.objects.all()[1:]:
+            Review.objects.create(title=one_hit, author=user, text='t',
+                                  score=10)
+        prior = RatingPrior.objects.get()
+        score_sum = sum(Review.objects.values_list('score', flat=True))
+        mean = score_sum / Review.objects.count()
+        assert abs(prior.mean - mean) < RATING_PRIOR_TOLERANCE, (
+            'Проверьте, что C пересчитывается, когда средняя оценка '
+            'уходит от него дальше RATING_PRIOR_TOLERANCE.'
+        )
+        for title in Title.objects.filter(review_count__gt=0):
+            assert title.weighted_rating == pytest.approx(
+                (title.score_sum + RATING_MIN_REVIEWS * prior.mean)
+                / (title.review_count + RATING_MIN_REVIEWS)
+            ), (
+                'Проверьте, что взвешенные рейтинги всех произведений '
+                'посчитаны с одним и тем же C из БД.'
+            )
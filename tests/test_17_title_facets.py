@@ -0,0 +1,43 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17TitleFacets:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_facets_for_current_filters(self, client, admin_client):
+        create_titles(admin_client)
+        data = client.get(self.TITLES_URL, {'facets': 'true'}).json()
+        assert data.get('facets') == {
+            'genre': {'horror': 1, 'comedy': 1, 'drama': 1},
+            'category': {'films': 1, 'books': 1},
+            'year': {'1984': 1, '1988': 1},
+        }, (
+            f'Проверьте, что `{self.TITLES_URL}?facets=true` возвращает '
+            'количество произведений по жанрам, категориям и годам.'
+        )
+
+        data = client.get(
+            self.TITLES_URL, {'facets': 'genre,year', 'category': 'films'}
+        ).json()
+        assert data['facets'] == {
+            'genre': {'horror': 1, 'comedy': 1},
+            'year': {'1984': 1},
+        }
+        assert 'facets' not in client.get(self.TITLES_URL).json()
+
+    def test_02_facets_in_one_query(self, client, admin_client):
+        create_titles(admin_client)
+        client.get(self.TITLES_URL, {'year': 1})
+        with CaptureQueriesContext(connection) as plain:
+            client.get(self.TITLES_URL, {'year': 1984})
+        with CaptureQueriesContext(connection) as faceted:
+            client.get(self.TITLES_URL, {'year': 1988, 'facets': 'true'})
+        assert len(faceted) == len(plain) + 1, (
+            'Проверьте, что фасеты считаются одним запросом к БД.'
+        )
@@ -0,0 +1,95 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.bitmaps import title_index
+from api.cache import bump_versions
+from reviews.models import Title
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18TitleBitmapFilter:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def get_names(self, client, params):
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.OK
+        return {title['name'] for title in response.json()['results']}
+
+    @pytest.mark.parametrize('max_id', (2 ** 20, 0))
+    def test_01_combined_filters(self, client, admin_client, settings,
+                                 max_id):
+        settings.API_BITMAP_MAX_ID = max_id
+        create_titles(admin_client)
+        admin_client.post(self.TITLES_URL, data={
+            'name': 'Чужие', 'year': 1986, 'genre': ['horror', 'drama'],
+            'category': 'films'
+        })
+        assert self.get_names(client, {'genre': 'comedy,drama'}) == {
+            'Терминатор', 'Крепкий орешек', 'Чужие'
+        }, (
+            'Проверьте, что фильтр `genre` принимает несколько жанров '
+            'через запятую и по умолчанию ищет любой из них.'
+        )
+        assert self.get_names(
+            client, {'genre': 'horror,drama', 'genre_mode': 'all'}
+        ) == {'Чужие'}, (
+            'Проверьте, что при `genre_mode=all` возвращаются произведения '
+            'со всеми указанными жанрами.'
+        )
+        assert self.get_names(
+            client, {'genre': 'horror,unknown', 'genre_mode': 'all'}
+        ) == set()
+        assert self.get_names(
+            client, {'year_min': 1985, 'category': 'films,books'}
+        ) == {'Крепкий орешек', 'Чужие'}, (
+            'Проверьте, что фильтры `year_min`, `year_max` и `category` '
+            'пересекаются с остальными условиями.'
+        )
+        assert self.get_names(
+            client, {'year_max': 1986, 'genre': 'horror', 'year': 1984}
+        ) == {'Терминатор'}
+        response = client.get(self.TITLES_URL, {'genre_mode': 'some'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert bool(title_index._years) == bool(max_id), (
+            'Проверьте, что при id больше API_BITMAP_MAX_ID битовый '
+            'индекс не строится, а фильтры выполняются в SQL.'
+        )
+
+    def test_02_index_follows_local_changes(self, client, admin_client,
+                                            monkeypatch):
+        titles, _, _ = create_titles(admin_client)
+        params = {'genre': 'drama', 'category': 'films'}
+        assert self.get_names(client, params) == set()
+        loads = []
+        load = title_index._load
+        monkeypatch.setattr(
+            title_index, '_load',
+            lambda versions: loads.append(versions) or load(versions)
+        )
+
+        admin_client.patch(
+            f"{self.TITLES_URL}{titles[1]['id']}/", data={'category': 'films'}
+        )
+        admin_client.delete('/api/v1/genres/horror/')
+        assert self.get_names(client, params) == {'Крепкий орешек'}, (
+            'Проверьте, что индекс фильтра обновляется при изменении '
+            'произведений и жанров.'
+        )
+        assert self.get_names(client, {'genre': 'horror'}) == set()
+        assert not loads, (
+            'Проверьте, что изменения в этом же процессе применяются к '
+            'индексу точечно, без перестройки.'
+        )
+
+    def test_03_rebuild_after_external_change(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        assert self.get_names(client, {'year': 2000}) == set()
+        Title.objects.filter(pk=titles[0]['id']).update(year=2000)
+        bump_versions('titles')
+        assert self.get_names(client, {'year': 2000}) == {'Терминатор'}, (
+            'Проверьте, что индекс перестраивается, если версию '
+            'произведений сдвинул другой процесс.'
+        )
@@ -0,0 +1,158 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Title
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19TitleBulk:
+
+    BULK_URL = '/api/v1/titles/bulk/'
+    TITLES_URL = '/api/v1/titles/'
+
+    def make_items(self, count, start=0):
+        return [{
+            'name': f'Произведение {number}',
+            'year': 1950 + number % 50,
+            'genre': ['horror', 'drama'],
+            'category': 'books',
+        } for number in range(start, start + count)]
+
+    def test_01_bulk_create_and_update(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        client.get(self.TITLES_URL, {'genre': 'comedy'})
+        items = self.make_items(2) + [{
+            'id': titles[0]['id'],
+            'name': 'Терминатор 2',
+            'year': 1991,
+            'genre': ['comedy', 'comedy'],
+            'category': 'films',
+        }]
+        response = admin_client.post(
+            self.BULK_URL, data=json.dumps(items),
+            content_type='application/json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос администратора к `{self.BULK_URL}` '
+            'с корректным пакетом возвращает ответ со статусом 201.'
+        )
+        results = response.json()['results']
+        assert [item['created'] for item in results] == [True, True, False]
+        assert results[2]['id'] == titles[0]['id']
+        assert Title.objects.count() == 4
+
+        created = client.get(f"{self.TITLES_URL}{results[0]['id']}/").json()
+        assert created['name'] == 'Произведение 0'
+        assert {genre['slug'] for genre in created['genre']} == {
+            'horror', 'drama'}
+        assert created['category']['slug'] == 'books'
+        updated = client.get(f"{self.TITLES_URL}{titles[0]['id']}/").json()
+        assert (updated['name'], updated['year']) == ('Терминатор 2', 1991)
+        assert [genre['slug'] for genre in updated['genre']] == ['comedy']
+
+        names = {title['name'] for title in client.get(
+            self.TITLES_URL, {'genre': 'drama', 'category': 'books'}
+        ).json()['results']}
+        assert names == {
+            'Крепкий орешек', 'Произведение 0', 'Произведение 1'
+        }, (
+            'Проверьте, что после пакетной записи фильтры и кеш списка '
+            'произведений видят новые данные.'
+        )
+        search = client.get(self.TITLES_URL, {'search': 'Произведение'})
+        assert search.json()['count'] == 2
+
+    def test_02_per_item_errors(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        items = self.make_items(5)
+        items[1]['genre'] = ['unknown']
+        items[2]['year'] = 3000
+        items[3]['id'] = 0
+        items[4]['id'] = items[0]['id'] = titles[1]['id']
+        response = admin_client.post(
+            self.BULK_URL, data=json.dumps(items),
+            content_type='application/json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = {
+            item['index']: set(item) - {'index'}
+            for item in response.json()['errors']
+        }
+        assert errors == {
+            0: {'id'}, 1: {'genre'}, 2: {'year'}, 3: {'id'}, 4: {'id'}
+        }, (
+            'Проверьте, что ошибки пакета возвращаются по индексам '
+            'элементов.'
+        )
+        assert Title.objects.count() == 2, (
+            'Проверьте, что пакет с ошибками не записывается частично.'
+        )
+
+        assert admin_client.post(
+            self.BULK_URL, data='[]', content_type='application/json'
+        ).status_code == HTTPStatus.BAD_REQUEST
+        assert user_client.post(
+            self.BULK_URL, data=json.dumps(self.make_items(1)),
+            content_type='application/json'
+        ).status_code == HTTPStatus.FORBIDDEN
+
+    def test_03_ndjson_query_budget(self, admin_client):
+        create_titles(admin_client)
+        query_counts = []
+        for start, count in ((0, 10), (10, 100)):
+            body = '\n'.join(
+                json.dumps(item) for item in self.make_items(count, start))
+            with CaptureQueriesContext(connection) as queries:
+                response = admin_client.post(
+                    self.BULK_URL, data=body,
+                    content_type='application/x-ndjson')
+            assert response.status_code == HTTPStatus.CREATED, (
+                f'Проверьте, что `{self.BULK_URL}` принимает NDJSON.'
+            )
+            query_counts.append(len(queries))
+        assert Title.objects.count() == 112
+        assert query_counts[0] == query_counts[1], (
+            'Проверьте, что число запросов к БД при пакетной записи не '
+            f'зависит от размера пакета: {query_counts}.'
+        )
+
+        response = admin_client.post(
+            self.BULK_URL, data='{"name": "x"}\n{oops',
+            content_type='application/x-ndjson')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_04_partial_update(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        first, second = (Title.objects.get(pk=title['id'])
+                         for title in titles[:2])
+        Title.objects.filter(pk__in=(first.pk, second.pk)).update(
+            description='dd')
+        items = [{
+            'id': str(first.pk), 'name': 'Новое имя', 'year': first.year,
+            'genre': ['drama'], 'category': 'films',
+        }, {
+            'id': second.pk, 'name': second.name, 'year': second.year,
+            'genre': ['drama'], 'category': 'films', 'description': 'Новое',
+        }]
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.post(
+                self.BULK_URL, data=json.dumps(items),
+                content_type='application/json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что id в пакете можно передать строкой.'
+        )
+        first.refresh_from_db()
+        second.refresh_from_db()
+        assert (first.name, first.description) == ('Новое имя', 'dd'), (
+            'Проверьте, что пакетное обновление не стирает поля, которых '
+            'нет в элементе.'
+        )
+        assert second.description == 'Новое'
+        assert not any(
+            query['sql'].startswith('SELECT')
+            and 'FROM "reviews_title_genre"' in query['sql']
+            for query in queries.captured_queries
+        ), 'Проверьте, что связи жанров удаляются одним запросом.'
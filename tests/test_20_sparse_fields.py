@@ -0,0 +1,100 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20SparseFields:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def get_with_queries(self, client, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url, params)
+        assert response.status_code == HTTPStatus.OK
+        return response.json(), ' '.join(
+            query['sql'] for query in queries.captured_queries)
+
+    def test_01_title_fields(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        data, sql = self.get_with_queries(
+            client, self.TITLES_URL, {'fields': 'id,name,rating'})
+        assert all(
+            set(title) == {'id', 'name', 'rating'}
+            for title in data['results']
+        ), (
+            f'Проверьте, что `{self.TITLES_URL}?fields=` оставляет в ответе '
+            'только перечисленные поля.'
+        )
+        assert 'reviews_title_genre' not in sql, (
+            'Проверьте, что без поля `genre` жанры не запрашиваются из БД.'
+        )
+        assert '"description"' not in sql, (
+            'Проверьте, что без поля `description` столбец не читается.'
+        )
+
+        data, _ = self.get_with_queries(
+            client, self.TITLES_URL, {'omit': 'description,genre'})
+        assert set(data['results'][0]) == {'id', 'name', 'year', 'rating',
+                                           'category'}
+
+        data, sql = self.get_with_queries(
+            client, f"{self.TITLES_URL}{titles[0]['id']}/",
+            {'fields': 'id', 'expand': 'score_distribution'})
+        assert data == {
+            'id': titles[0]['id'],
+            'score_distribution': {str(score): 0 for score in range(1, 11)},
+        }, (
+            'Проверьте, что `expand=score_distribution` добавляет '
+            'гистограмму оценок произведения.'
+        )
+        assert 'reviews_scoredistribution' in sql
+
+        response = admin_client.patch(
+            f"{self.TITLES_URL}{titles[0]['id']}/?fields=id",
+            data={'year': 1985})
+        assert response.status_code == HTTPStatus.OK
+        assert 'genre' in response.json(), (
+            'Проверьте, что параметры полей не влияют на ответы на запись.'
+        )
+
+    def test_02_review_and_comment_fields(self, client, admin_client, admin,
+                                          user, user_client):
+        author_map = {admin: admin_client, user: user_client}
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'])
+        data, sql = self.get_with_queries(
+            client, reviews_url, {'fields': 'id,score'})
+        assert set(data['results'][0]) == {'id', 'score'}
+        assert '"reviews_user"' not in sql, (
+            'Проверьте, что без поля `author` отзывы не соединяются '
+            'с таблицей пользователей.'
+        )
+
+        data, sql = self.get_with_queries(
+            client, reviews_url, {'omit': 'text', 'expand': 'title'})
+        review = data['results'][0]
+        assert set(review) == {'id', 'score', 'author', 'pub_date',
+                               'comments_count', 'title'}
+        assert review['title'] == {
+            'id': titles[0]['id'], 'name': titles[0]['name'],
+            'year': titles[0]['year']
+        }
+
+        comments_url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id'])
+        data, _ = self.get_with_queries(
+            client, comments_url, {'fields': 'text', 'expand': 'review'})
+        assert data['results'][0]['review']['id'] == reviews[0]['id']
+        assert set(data['results'][0]) == {'text', 'review'}, (
+            'Проверьте, что комментарии поддерживают `fields` и `expand`.'
+        )
@@ -0,0 +1,80 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from api.compiled import CompiledSerializer
+from api.serializers import (CommentSerializer, ReviewSerializer,
+                             TitleSerializer)
+from reviews.models import Comment, Review, Title
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21CompiledSerializer:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def render_both(self, serializer_class, queryset):
+        compiled = CompiledSerializer.compile(
+            serializer_class(many=True).child)
+        assert compiled is not None, (
+            f'Проверьте, что `{serializer_class.__name__}` поддерживает '
+            'быстрое представление по values().'
+        )
+        return (
+            JSONRenderer().render(serializer_class(queryset, many=True).data),
+            JSONRenderer().render(
+                compiled.represent(queryset.values(*compiled.columns))),
+        )
+
+    def test_01_byte_identical(self, admin_client, admin, user, user_client):
+        author_map = {admin: admin_client, user: user_client}
+        create_comments(admin_client, author_map)
+        Title.objects.create(name='Без категории', year=2000)
+        Title.objects.filter(pk=Title.objects.order_by('pk').first().pk
+                             ).update(rating=6.5)
+        for serializer_class, queryset in (
+            (TitleSerializer, Title.objects.order_by('id')),
+            (ReviewSerializer, Review.objects.order_by('id')),
+            (CommentSerializer, Comment.objects.order_by('id')),
+        ):
+            classic, compiled = self.render_both(serializer_class, queryset)
+            assert classic == compiled, (
+                'Проверьте, что быстрое представление '
+                f'`{serializer_class.__name__}` совпадает с обычным '
+                'побайтно.'
+            )
+
+    def test_02_list_endpoints(self, client, admin_client, admin, user,
+                               user_client, monkeypatch):
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, titles = create_comments(admin_client, author_map)
+        calls = []
+        represent = CompiledSerializer.represent
+        monkeypatch.setattr(
+            CompiledSerializer, 'represent',
+            lambda self, rows: calls.append(1) or represent(self, rows)
+        )
+        urls = (
+            self.TITLES_URL,
+            f"{self.TITLES_URL}{titles[0]['id']}/reviews/",
+            f"{self.TITLES_URL}{titles[0]['id']}/reviews/"
+            f"{reviews[0]['id']}/comments/",
+        )
+        for url in urls:
+            assert client.get(url).status_code == HTTPStatus.OK
+            assert client.get(url, {'cursor': ''}).status_code == (
+                HTTPStatus.OK)
+        assert len(calls) == 6, (
+            'Проверьте, что списки произведений, отзывов и комментариев '
+            'строятся быстрым представлением.'
+        )
+
+        data = client.get(
+            self.TITLES_URL, {'expand': 'score_distribution'}).json()
+        assert 'score_distribution' in data['results'][0], (
+            'Проверьте, что для неподдерживаемых полей используется '
+            'обычный сериализатор.'
+        )
+        assert len(calls) == 6
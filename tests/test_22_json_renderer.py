@@ -0,0 +1,84 @@
+import datetime
+import io
+from decimal import Decimal
+
+import pytest
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from api import parsers, renderers
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+from tests.utils import create_titles
+
+PAYLOAD = {
+    'count': 2,
+    'next': None,
+    'results': ReturnList([
+        ReturnDict({
+            'id': 1,
+            'name': 'Терминатор   «кавычки» \U0001F600',
+            'rating': 6.5,
+            'genre': [{'name': 'Ужасы', 'slug': 'horror'}],
+            'category': None,
+            'pub_date': '2024-01-02T03:04:05.123456Z',
+        }, serializer=None),
+    ], serializer=None),
+    'facets': {'year': {'1984': 1}},
+    'decimal': Decimal('1.5'),
+    'nested': [[1, 2], [3, [4, []]]],
+}
+
+
+class Test22JSONRenderer:
+
+    def test_01_same_bytes_as_json_renderer(self):
+        assert FastJSONRenderer().render(PAYLOAD) == (
+            JSONRenderer().render(PAYLOAD)
+        ), (
+            'Проверьте, что FastJSONRenderer выдаёт те же байты, что и '
+            'стандартный JSONRenderer.'
+        )
+        assert FastJSONRenderer().render(None) == b''
+        assert FastJSONRenderer().render(
+            PAYLOAD, 'application/json; indent=4'
+        ) == JSONRenderer().render(PAYLOAD, 'application/json; indent=4')
+        big = {'value': 2 ** 70}
+        assert FastJSONRenderer().render(big) == JSONRenderer().render(big)
+
+    def test_02_datetime_like_datetime_field(self):
+        value = datetime.datetime(
+            2024, 1, 2, 3, 4, 5, 123456, tzinfo=datetime.timezone.utc)
+        assert FastJSONRenderer().render({'pub_date': value}) == (
+            b'{"pub_date":"2024-01-02T03:04:05.123456Z"}'
+        )
+
+    def test_03_parser(self):
+        body = '{"name": "Чужие", "genre": ["horror"], "year": 1986}'
+        assert FastJSONParser().parse(io.BytesIO(body.encode())) == (
+            JSONParser().parse(io.BytesIO(body.encode()))
+        )
+        for invalid in (b'{"name": ', b'{"score": NaN}'):
+            with pytest.raises(ParseError):
+                FastJSONParser().parse(io.BytesIO(invalid))
+
+    def test_04_stdlib_fallback(self, monkeypatch):
+        monkeypatch.setattr(renderers, 'orjson', None)
+        monkeypatch.setattr(parsers, 'orjson', None)
+        assert FastJSONRenderer().render(PAYLOAD) == (
+            JSONRenderer().render(PAYLOAD)
+        ), 'Проверьте, что без orjson используется стандартный json.'
+        assert FastJSONParser().parse(io.BytesIO(b'[1, 2]')) == [1, 2]
+        with pytest.raises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'[NaN]'))
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_api_uses_fast_renderer(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get('/api/v1/titles/')
+        assert isinstance(response.accepted_renderer, FastJSONRenderer), (
+            'Проверьте, что FastJSONRenderer подключён в REST_FRAMEWORK.'
+        )
+        assert response.content == JSONRenderer().render(response.data)
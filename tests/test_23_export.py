@@ -0,0 +1,83 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from api.views import ExportApiView
+from reviews.models import Review
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Export:
+
+    EXPORT_URL_TEMPLATE = '/api/v1/export/{}/'
+
+    def get_lines(self, client, collection, params=None):
+        response = client.get(self.EXPORT_URL_TEMPLATE.format(collection),
+                              params or {})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что `{self.EXPORT_URL_TEMPLATE.format(collection)}` '
+            'доступен администратору.'
+        )
+        assert response.streaming, 'Проверьте, что выгрузка идёт потоком.'
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        content = b''.join(response.streaming_content)
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_01_export(self, client, admin_client, admin, user, user_client,
+                       monkeypatch):
+        monkeypatch.setattr(ExportApiView, 'chunk_size', 1)
+        author_map = {admin: admin_client, user: user_client}
+        comments, reviews, titles = create_comments(admin_client, author_map)
+
+        lines = self.get_lines(admin_client, 'titles')
+        assert [line['id'] for line in lines] == sorted(
+            title['id'] for title in titles)
+        assert lines[0] == client.get(
+            f"/api/v1/titles/{lines[0]['id']}/").json(), (
+            'Проверьте, что строки выгрузки произведений совпадают с '
+            'ответом API.'
+        )
+
+        lines = self.get_lines(admin_client, 'reviews')
+        assert [(line['id'], line['title']) for line in lines] == [
+            (review['id'], titles[0]['id']) for review in reviews
+        ]
+        assert {'text', 'score', 'author', 'pub_date'} <= set(lines[0])
+
+        lines = self.get_lines(admin_client, 'comments')
+        assert [(line['id'], line['review']) for line in lines] == [
+            (comment['id'], reviews[0]['id']) for comment in comments
+        ]
+
+    def test_02_since(self, admin_client, admin, user, user_client):
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, titles = create_comments(admin_client, author_map)
+        lines = self.get_lines(
+            admin_client, 'reviews', {'since': reviews[0]['id']})
+        assert [line['id'] for line in lines] == [reviews[1]['id']], (
+            'Проверьте, что `since=<id>` отдаёт только более новые строки.'
+        )
+        first = Review.objects.get(pk=reviews[0]['id'])
+        lines = self.get_lines(
+            admin_client, 'reviews', {'since': first.pub_date.isoformat()})
+        assert [line['id'] for line in lines] == [reviews[1]['id']]
+        assert self.get_lines(
+            admin_client, 'titles', {'since': titles[1]['id']}) == []
+
+        for collection, since in (('reviews', 'вчера'),
+                                  ('titles', '2024-01-01T00:00:00')):
+            response = admin_client.get(
+                self.EXPORT_URL_TEMPLATE.format(collection), {'since': since})
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_admin_only(self, client, user_client, moderator_client):
+        for collection in ('titles', 'reviews', 'comments'):
+            url = self.EXPORT_URL_TEMPLATE.format(collection)
+            assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+            for role_client in (user_client, moderator_client):
+                assert role_client.get(url).status_code == (
+                    HTTPStatus.FORBIDDEN), (
+                    f'Проверьте, что `{url}` доступен только администратору.'
+                )
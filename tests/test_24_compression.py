@@ -0,0 +1,114 @@
+import gzip
+import json
+from http import HTTPStatus
+
+import pytest
+from django.test import RequestFactory
+
+from api import compression
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24Compression:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture(autouse=True)
+    def small_threshold(self, settings):
+        settings.API_COMPRESSION_MIN_SIZE = 100
+
+    def test_01_gzip_negotiation(self, client, admin_client):
+        create_titles(admin_client)
+        plain = client.get(self.TITLES_URL, {'page': 1})
+        assert 'Content-Encoding' not in plain
+
+        response = client.get(self.TITLES_URL, HTTP_ACCEPT_ENCODING='gzip')
+        assert response['Content-Encoding'] == 'gzip', (
+            'Проверьте, что ответы API сжимаются gzip, если клиент '
+            'передал `Accept-Encoding: gzip`.'
+        )
+        assert 'Accept-Encoding' in response['Vary']
+        assert response['ETag'].startswith('W/')
+        assert json.loads(gzip.decompress(response.content)) == plain.json()
+
+        for header in ('gzip;q=0', 'identity', 'br;q=1'):
+            response = client.get(
+                self.TITLES_URL, {'page': 1}, HTTP_ACCEPT_ENCODING=header)
+            assert 'Content-Encoding' not in response, (
+                f'Проверьте согласование сжатия для `{header}`.'
+            )
+        response = client.get(
+            '/api/v1/titles/0/', HTTP_ACCEPT_ENCODING='gzip')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        assert 'Content-Encoding' not in response, (
+            'Проверьте, что ответы меньше порога не сжимаются.'
+        )
+
+    def test_02_cached_compressed_bytes(self, client, admin_client,
+                                        monkeypatch):
+        create_titles(admin_client)
+        calls = []
+        compress = compression.compress
+        monkeypatch.setattr(
+            compression, 'compress',
+            lambda data, encoding: calls.append(encoding) or compress(
+                data, encoding)
+        )
+        first = client.get(self.TITLES_URL, HTTP_ACCEPT_ENCODING='gzip')
+        second = client.get(self.TITLES_URL, HTTP_ACCEPT_ENCODING='gzip')
+        assert (first['X-Cache'], second['X-Cache']) == ('MISS', 'HIT')
+        assert second.content == first.content
+        assert second['Content-Encoding'] == 'gzip'
+        assert second['Content-Type'] == first['Content-Type']
+        assert second['ETag'] == first['ETag']
+        assert calls == ['gzip'], (
+            'Проверьте, что сжатые байты закешированного ответа '
+            'сохраняются в кеш и не сжимаются повторно.'
+        )
+        response = client.get(
+            self.TITLES_URL, HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=first['ETag'])
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_03_streaming_export(self, admin_client):
+        create_titles(admin_client)
+        response = admin_client.get(
+            '/api/v1/export/titles/', HTTP_ACCEPT_ENCODING='gzip')
+        assert response['Content-Encoding'] == 'gzip'
+        lines = gzip.decompress(
+            b''.join(response.streaming_content)).splitlines()
+        assert len(lines) == 2, (
+            'Проверьте, что потоковая выгрузка тоже сжимается.'
+        )
+
+    def test_04_not_modified_headers(self, client, admin_client):
+        create_titles(admin_client)
+        full = client.get(self.TITLES_URL, HTTP_ACCEPT_ENCODING='gzip')
+        assert full['Content-Encoding'] == 'gzip'
+        response = client.get(
+            self.TITLES_URL, HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=full['ETag'])
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert 'Content-Encoding' not in response
+        for header in ('ETag', 'Vary'):
+            assert response[header] == full[header], (
+                f'Проверьте, что ответ 304 несёт тот же `{header}`, '
+                'что и сжатый ответ 200.'
+            )
+
+
+class Test24ChooseEncoding:
+
+    def choose(self, header):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=header)
+        return compression.choose_encoding(request)
+
+    def test_01_quality_values(self, monkeypatch):
+        monkeypatch.setattr(compression, 'ENCODINGS', ('br', 'gzip'))
+        assert self.choose('gzip, deflate, br') == 'br'
+        assert self.choose('gzip;q=1.0, br;q=0.5') == 'gzip'
+        assert self.choose('br;q=0, gzip;q=0.1') == 'gzip'
+        assert self.choose('*') == 'br'
+        assert self.choose('*;q=0, deflate') is None
+        assert self.choose('') is None
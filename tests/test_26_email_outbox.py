@@ -0,0 +1,137 @@
+import threading
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+from api.utils import EMAIL_MAX_ATTEMPTS, EMAIL_RETRY_DELAY
+from reviews.mail import background_sender
+from reviews.models import OutgoingEmail
+
+
+class CountingBackend(EmailBackend):
+    opened = 0
+    fail = False
+    release = None
+
+    def open(self):
+        type(self).opened += 1
+        if self.release is not None:
+            self.release.wait(5)
+        return super().open()
+
+    def send_messages(self, messages):
+        if self.fail:
+            raise ConnectionRefusedError('SMTP недоступен')
+        return super().send_messages(messages)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26EmailOutbox:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    @pytest.fixture(autouse=True)
+    def backend(self, settings):
+        settings.EMAIL_BACKEND = (
+            'tests.test_26_email_outbox.CountingBackend')
+        CountingBackend.opened = 0
+        CountingBackend.fail = False
+        CountingBackend.release = None
+        yield CountingBackend
+        CountingBackend.release = None
+
+    def signup(self, client, number):
+        response = client.post(self.URL_SIGNUP, data={
+            'username': f'user{number}', 'email': f'user{number}@yamdb.fake',
+        })
+        assert response.status_code == HTTPStatus.OK
+        return response
+
+    def test_01_background_thread(self, client, settings, backend):
+        settings.EMAIL_DELIVERY = 'thread'
+        backend.release = threading.Event()
+        self.signup(client, 1)
+        assert not mail.outbox, (
+            'Проверьте, что ответ на регистрацию не ждёт отправки письма.'
+        )
+        backend.release.set()
+        background_sender.schedule().result(timeout=5)
+        assert [message.to for message in mail.outbox] == [
+            ['user1@yamdb.fake']
+        ], 'Проверьте, что письмо отправляется фоновым потоком.'
+        assert not OutgoingEmail.objects.exists()
+
+    def test_02_worker_batch(self, client, settings, backend):
+        settings.EMAIL_DELIVERY = 'worker'
+        for number in range(3):
+            self.signup(client, number)
+        assert not mail.outbox
+        assert OutgoingEmail.objects.count() == 3
+        call_command('send_emails')
+        assert len(mail.outbox) == 3, (
+            'Проверьте, что команда send_emails отправляет очередь писем.'
+        )
+        assert backend.opened == 1, (
+            'Проверьте, что пакет писем отправляется через одно '
+            'соединение с почтовым сервером.'
+        )
+        assert not OutgoingEmail.objects.exists()
+
+    def test_03_retry_with_backoff(self, client, settings, backend):
+        settings.EMAIL_DELIVERY = 'worker'
+        self.signup(client, 1)
+        backend.fail = True
+        call_command('send_emails')
+        email = OutgoingEmail.objects.get()
+        assert email.attempts == 1
+        assert 'SMTP недоступен' in email.last_error
+        delay = email.next_attempt_at - timezone.now()
+        assert timedelta(seconds=EMAIL_RETRY_DELAY - 5) < delay <= (
+            timedelta(seconds=EMAIL_RETRY_DELAY)
+        ), 'Проверьте паузу перед повторной попыткой отправки.'
+
+        backend.fail = False
+        call_command('send_emails')
+        assert not mail.outbox, (
+            'Проверьте, что письмо не отправляется до следующей попытки.'
+        )
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        backend.fail = True
+        call_command('send_emails')
+        email.refresh_from_db()
+        assert email.attempts == 2
+        assert email.next_attempt_at - timezone.now() > delay, (
+            'Проверьте, что пауза между попытками растёт.'
+        )
+
+        OutgoingEmail.objects.update(
+            next_attempt_at=timezone.now(), attempts=EMAIL_MAX_ATTEMPTS)
+        backend.fail = False
+        call_command('send_emails')
+        assert not mail.outbox, (
+            'Проверьте, что после EMAIL_MAX_ATTEMPTS попыток письмо '
+            'больше не отправляется.'
+        )
+        assert not OutgoingEmail.objects.exists(), (
+            'Проверьте, что send_emails удаляет брошенные письма.'
+        )
+
+    def test_04_given_up_purged(self, client, settings, backend):
+        settings.EMAIL_DELIVERY = 'worker'
+        self.signup(client, 1)
+        self.signup(client, 2)
+        OutgoingEmail.objects.filter(to='user1@yamdb.fake').update(
+            attempts=EMAIL_MAX_ATTEMPTS - 1)
+        backend.fail = True
+        call_command('send_emails')
+        assert list(OutgoingEmail.objects.values_list('to', 'attempts')) == [
+            ('user2@yamdb.fake', 1)
+        ], (
+            'Проверьте, что письмо с кодом подтверждения удаляется после '
+            'последней неудачной попытки, а остальные ждут повтора.'
+        )
@@ -0,0 +1,70 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27SignupQueries:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_USERS = '/api/v1/users/'
+
+    @pytest.fixture(autouse=True)
+    def worker_delivery(self, settings):
+        settings.EMAIL_DELIVERY = 'worker'
+
+    def post_with_user_reads(self, client, url, data):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(url, data=data)
+        reads = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT')
+            and '"reviews_user"' in query['sql']
+        ]
+        return response, reads
+
+    def test_01_signup_single_read(self, client, django_user_model):
+        data = {'username': 'new_user', 'email': 'new_user@yamdb.fake'}
+        for expected in (HTTPStatus.OK, HTTPStatus.OK):
+            response, reads = self.post_with_user_reads(
+                client, self.URL_SIGNUP, data)
+            assert response.status_code == expected
+            assert len(reads) == 1, (
+                'Проверьте, что регистрация проверяет username и email '
+                'одним запросом к таблице пользователей.'
+            )
+        assert django_user_model.objects.filter(**data).count() == 1
+
+        for conflict, message in (
+            ({'username': 'new_user', 'email': 'other@yamdb.fake'},
+             'Пользователь с таким именем уже существует.'),
+            ({'username': 'other', 'email': 'new_user@yamdb.fake'},
+             'Пользователь с такой почтой уже существует.'),
+        ):
+            response, reads = self.post_with_user_reads(
+                client, self.URL_SIGNUP, conflict)
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+            assert response.json() == {'non_field_errors': [message]}
+            assert len(reads) == 1
+
+    def test_02_admin_create_single_read(self, admin_client, admin):
+        data = {'username': 'new_user', 'email': 'new_user@yamdb.fake'}
+        response, reads = self.post_with_user_reads(
+            admin_client, self.URL_USERS, data)
+        assert response.status_code == HTTPStatus.CREATED
+        # Один запрос - аутентификация администратора.
+        assert len(reads) == 2, (
+            'Проверьте, что создание пользователя проверяет username и '
+            'email одним запросом.'
+        )
+        response, reads = self.post_with_user_reads(
+            admin_client, self.URL_USERS,
+            {'username': 'other', 'email': data['email']})
+        assert response.json() == {'email': ['email уже занят']}
+        assert len(reads) == 2
+        response, _ = self.post_with_user_reads(
+            admin_client, self.URL_USERS,
+            {'username': data['username'], 'email': 'other@yamdb.fake'})
+        assert response.json() == {'non_field_errors': ['username уже занят']}
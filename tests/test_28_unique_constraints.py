@@ -0,0 +1,66 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28UniqueConstraints:
+
+    def post_with_queries(self, client, url, data):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(url, data=data)
+        return response, [query['sql'] for query in queries.captured_queries]
+
+    def test_01_review_constraint(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f"/api/v1/titles/{titles[0]['id']}/reviews/"
+        data = {'text': 'Отзыв', 'score': 7}
+        response, queries = self.post_with_queries(user_client, url, data)
+        assert response.status_code == HTTPStatus.CREATED
+        assert not any(
+            sql.startswith('SELECT') and 'FROM "reviews_review"' in sql
+            for sql in queries
+        ), (
+            'Проверьте, что перед созданием отзыва не выполняется проверка '
+            'существования: уникальность обеспечивает ограничение БД.'
+        )
+
+        response, _ = self.post_with_queries(
+            user_client, url, {'text': 'Ещё отзыв', 'score': 1})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {'non_field_errors': [
+            'Вы уже оставляли отзыв на это произведение.'
+        ]}, (
+            'Проверьте, что нарушение уникальности отзыва возвращает '
+            'прежнее сообщение об ошибке.'
+        )
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.review_count, title.score_sum) == (1, 7), (
+            'Проверьте, что отклонённый отзыв не меняет рейтинг.'
+        )
+        assert Review.objects.count() == 1
+
+        response = admin_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.CREATED
+
+    @pytest.mark.parametrize('url,message', (
+        ('/api/v1/categories/', 'Такая категория уже есть'),
+        ('/api/v1/genres/', 'Такой жанр уже есть'),
+    ))
+    def test_02_slug_constraint(self, admin_client, url, message):
+        data = {'name': 'Имя', 'slug': 'slug'}
+        assert admin_client.post(url, data=data).status_code == (
+            HTTPStatus.CREATED)
+        response = admin_client.post(url, data={'name': 'Другое',
+                                                'slug': 'slug'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {'slug': [message]}, (
+            f'Проверьте, что повторный slug в `{url}` возвращает прежнее '
+            'сообщение об ошибке.'
+        )
+        assert admin_client.get(url).json()['count'] == 1
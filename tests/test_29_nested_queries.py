@@ -0,0 +1,93 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.pagination import PubDatePagination
+from tests.utils import (create_comments, create_single_review,
+                         create_titles, data_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29NestedQueries:
+
+    def get_with_queries(self, client, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        return response, data_queries(queries)
+
+    def parent_reads(self, queries, table):
+        return [sql for sql in queries
+                if sql.startswith('SELECT') and f'FROM "{table}"' in sql]
+
+    def test_01_fixed_query_count(self, client, admin, admin_client,
+                                  moderator, moderator_client, monkeypatch):
+        comments, reviews, titles = create_comments(admin_client, {
+            admin: admin_client, moderator: moderator_client})
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        reviews_url = f'/api/v1/titles/{title_id}/reviews/'
+        comments_url = f'{reviews_url}{review_id}/comments/'
+        for url, table in ((reviews_url, 'reviews_title'),
+                           (comments_url, 'reviews_review')):
+            counts = set()
+            for page_size in (1, 2):
+                monkeypatch.setattr(PubDatePagination, 'page_size',
+                                    page_size)
+                response, queries = self.get_with_queries(client, url)
+                assert len(response.json()['results']) == page_size
+                assert response.status_code == HTTPStatus.OK
+                assert not self.parent_reads(queries, table), (
+                    f'Проверьте, что `{url}` фильтрует выборку по id '
+                    'родителя из URL без отдельного запроса родителя.'
+                )
+                counts.add(len(queries))
+            response, queries = self.get_with_queries(
+                client, f'{url}{response.json()["results"][0]["id"]}/')
+            assert response.status_code == HTTPStatus.OK
+            assert len(queries) == 1, (
+                f'Проверьте, что объект из `{url}` читается одним запросом.'
+            )
+            assert counts == {2}, (
+                f'Проверьте, что число запросов к `{url}` постоянно.'
+            )
+
+    def test_02_missing_parent(self, client, admin, admin_client):
+        _, reviews, titles = create_comments(admin_client,
+                                             {admin: admin_client})
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        other_title_id = titles[1]['id']
+        for url, message in (
+            ('/api/v1/titles/999/reviews/', 'Title'),
+            (f'/api/v1/titles/999/reviews/{review_id}/', 'Title'),
+            (f'/api/v1/titles/{title_id}/reviews/999/comments/', 'Review'),
+            (f'/api/v1/titles/{other_title_id}/reviews/{review_id}'
+             '/comments/', 'Review'),
+        ):
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что `{url}` с несуществующим родителем '
+                'возвращает 404.'
+            )
+            assert response.json() == {
+                'detail': f'No {message} matches the given query.'}
+
+        response, queries = self.get_with_queries(
+            client, f'/api/v1/titles/{other_title_id}/reviews/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'] == []
+        assert len(self.parent_reads(queries, 'reviews_title')) == 1
+
+    def test_03_create_reads_parent_once(self, user_client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        with CaptureQueriesContext(connection) as queries:
+            response = create_single_review(
+                user_client, titles[0]['id'], 'Отзыв', 5)
+        assert response.status_code == HTTPStatus.CREATED
+        sql = data_queries(queries)
+        loads = [query for query in self.parent_reads(sql, 'reviews_title')
+                 if query.startswith('SELECT "reviews_title"."id"')]
+        assert len(loads) == 1, (
+            'Проверьте, что при создании отзыва произведение читается '
+            'один раз.'
+        )
@@ -0,0 +1,74 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.pagination import PubDatePagination
+from reviews.models import Comment, Review
+from tests.utils import create_titles, data_queries
+
+ROWS = 60
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30AuthorQueries:
+
+    @pytest.fixture
+    def rows(self, admin_client, django_user_model, monkeypatch):
+        monkeypatch.setattr(PubDatePagination, 'page_size', ROWS)
+        titles, _, _ = create_titles(admin_client)
+        authors = django_user_model.objects.bulk_create(
+            django_user_model(username=f'author{number}',
+                              email=f'author{number}@yamdb.fake')
+            for number in range(ROWS)
+        )
+        reviews = Review.objects.bulk_create(
+            Review(title_id=titles[0]['id'], author=author, text='Отзыв',
+                   score=5)
+            for author in authors
+        )
+        Comment.objects.bulk_create(
+            Comment(review=reviews[0], author=author, text='Комментарий')
+            for author in authors
+        )
+        url = f"/api/v1/titles/{titles[0]['id']}/reviews/"
+        return url, f'{url}{reviews[0].pk}/comments/'
+
+    @pytest.mark.parametrize('index,expand', (
+        (0, 'title'), (1, 'review'),
+    ))
+    def test_01_list_query_budget(self, client, rows, index, expand):
+        url = rows[index]
+        for params in ('', f'?expand={expand}'):
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(f'{url}{params}')
+            assert response.status_code == HTTPStatus.OK
+            results = response.json()['results']
+            assert len(results) == ROWS
+            assert {item['author'] for item in results} == {
+                f'author{number}' for number in range(ROWS)
+            }
+            assert len(data_queries(queries)) == 2, (
+                f'Проверьте, что `{url}{params}` читает страницу из {ROWS} '
+                'объектов вместе с авторами: запрос количества и запрос '
+                'страницы.'
+            )
+            assert not any(
+                '"reviews_user"."password"' in query['sql']
+                for query in queries.captured_queries
+            ), (
+                f'Проверьте, что `{url}{params}` читает из таблицы '
+                'пользователей только username.'
+            )
+
+    def test_02_detail_query_budget(self, client, rows):
+        url = rows[0]
+        review_id = client.get(url).json()['results'][0]['id']
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(f'{url}{review_id}/?expand=title')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['author'].startswith('author')
+        assert len(data_queries(queries)) == 1, (
+            'Проверьте, что отзыв читается вместе с автором одним запросом.'
+        )
@@ -0,0 +1,64 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review
+from tests.utils import create_comments, create_single_comment
+
+
+@pytest.mark.django_db(transaction=True)
+class Test31CommentsCount:
+
+    def get_counts(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/reviews/')
+        assert response.status_code == HTTPStatus.OK
+        return {review['id']: review['comments_count']
+                for review in response.json()['results']}
+
+    def test_01_counter_follows_comments(self, client, admin, admin_client,
+                                         user, user_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client})
+        title_id = titles[0]['id']
+        first, second = reviews[0]['id'], reviews[1]['id']
+        assert self.get_counts(client, title_id) == {first: 2, second: 0}, (
+            'Проверьте, что в списке отзывов есть поле `comments_count` '
+            'с числом комментариев.'
+        )
+        comment = create_single_comment(
+            admin_client, title_id, second, 'Ещё комментарий').json()
+        detail = client.get(
+            f'/api/v1/titles/{title_id}/reviews/{second}/').json()
+        assert detail['comments_count'] == 1, (
+            'Проверьте, что создание комментария увеличивает '
+            '`comments_count` отзыва.'
+        )
+
+        response = admin_client.delete(
+            f'/api/v1/titles/{title_id}/reviews/{second}/comments/'
+            f'{comment["id"]}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_counts(client, title_id)[second] == 0, (
+            'Проверьте, что удаление комментария уменьшает '
+            '`comments_count` отзыва.'
+        )
+
+        create_single_comment(admin_client, title_id, second, 'Комментарий')
+        user.delete()
+        assert self.get_counts(client, title_id) == {first: 1}, (
+            'Проверьте, что удаление пользователя вместе с его '
+            'комментариями уменьшает `comments_count`.'
+        )
+
+    def test_02_rebuild_command(self, client, admin, admin_client):
+        _, reviews, titles = create_comments(admin_client,
+                                             {admin: admin_client})
+        Review.objects.update(comments_count=100)
+        call_command('recalc_comments')
+        assert self.get_counts(client, titles[0]['id']) == {
+            reviews[0]['id']: 1
+        }, (
+            'Проверьте, что команда recalc_comments пересчитывает '
+            '`comments_count` по комментариям.'
+        )
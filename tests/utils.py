@@ -1,5 +1,21 @@
 from http import HTTPStatus
 
+VERSIONS_TABLE = '"reviews_collectionversion"'
+COUNTERS_TABLE = '"reviews_cachecounter"'
+
+
+def data_queries(queries):
+    """SQL запросов, кроме чтения версий коллекций (один раз за запрос)
+    и записи счётчиков кеша (раз в API_CACHE_STATS_INTERVAL)."""
+    return [query['sql'] for query in queries.captured_queries
+            if VERSIONS_TABLE not in query['sql']
+            and COUNTERS_TABLE not in query['sql']]
+
+
+def version_queries(queries):
+    return [query['sql'] for query in queries.captured_queries
+            if VERSIONS_TABLE in query['sql']]
+
 
 check_name_and_slug_patterns = (
     (